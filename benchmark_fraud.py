@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""benchmark_fraud.py
+
+Latency/throughput benchmark for fraud scoring.
+
+Replays ngo_fraud.csv plus synthetic organizations of increasing text length
+through predict_fraud / predict_fraud_batch at every combination of batch size
+and torch thread count, and reports p50/p95/p99 latency, rows/sec and peak RSS
+as JSON. With --baseline, results are compared against a stored run and
+regressions are flagged (non-zero exit code).
+
+Usage:
+    python benchmark_fraud.py --batch-sizes 1,8,32 --threads 1,2,4 --output bench.json
+    python benchmark_fraud.py --baseline bench_baseline.json
+    python benchmark_fraud.py --save-baseline bench_baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import time
+from typing import List
+
+import fraud_detection
+
+SYNTHETIC_WORD_COUNTS = (16, 64, 256, 1024)
+
+
+def load_dataset_orgs(dataset_path: str) -> List[dict]:
+    import pandas as pd
+
+    # As strings, so IDs like FCRA numbers keep their leading zeros and aren't read as floats
+    df = pd.read_csv(dataset_path, dtype=str, keep_default_na=False)
+    return [
+        {
+            'org_name': row.get('org_name', ''),
+            'bio': row['text'],
+            'recent_posts': row.get('campaign_description', ''),
+            'pan': row.get('pan') or None,
+            'registration_type': row.get('registration_type') or None,
+            'registration_number': row.get('registration_number') or None,
+            'ngo_darpan_id': row.get('ngo_darpan_id') or None,
+            'fcra_number': row.get('fcra_number') or None,
+        }
+        for row in df.to_dict('records')
+    ]
+
+
+def synthetic_orgs(seed_orgs: List[dict], word_counts=SYNTHETIC_WORD_COUNTS, per_length: int = 16) -> List[dict]:
+    """Organizations whose bios are built from the dataset's vocabulary at fixed word counts."""
+    rng = random.Random(42)
+    vocabulary = " ".join(org['bio'] for org in seed_orgs).split() or ["donate"]
+    orgs = []
+    for word_count in word_counts:
+        for i in range(per_length):
+            orgs.append({
+                'org_name': f"Synthetic Org {word_count}-{i}",
+                'bio': " ".join(rng.choice(vocabulary) for _ in range(word_count)),
+                'recent_posts': "",
+                'pan': 'ABCDE1234F',
+            })
+    return orgs
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def run_config(orgs: List[dict], batch_size: int, threads: int, repeat: int) -> dict:
+    import torch
+
+    torch.set_num_threads(threads)
+    latencies_ms = []
+    rows = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for start in range(0, len(orgs), batch_size):
+            batch = orgs[start:start + batch_size]
+            call_started = time.perf_counter()
+            if batch_size == 1:
+                fraud_detection.predict_fraud(batch[0])
+            else:
+                fraud_detection.predict_fraud_batch(batch, batch_size=batch_size)
+            latencies_ms.append((time.perf_counter() - call_started) * 1000.0)
+            rows += len(batch)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'batch_size': batch_size,
+        'threads': threads,
+        'calls': len(latencies_ms),
+        'rows': rows,
+        'p50_ms': percentile(latencies_ms, 50),
+        'p95_ms': percentile(latencies_ms, 95),
+        'p99_ms': percentile(latencies_ms, 99),
+        'rows_per_sec': rows / elapsed if elapsed else 0.0,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def run_benchmark(dataset_path: str, batch_sizes: List[int], thread_counts: List[int], repeat: int = 1,
+                  use_cache: bool = False) -> dict:
+    if not use_cache:
+        # Measure the model, not the prediction cache
+        fraud_detection.prediction_cache.max_entries = 0
+
+    fraud_detection.fraud_model.load()
+    fraud_detection.fraud_model.warmup()
+
+    dataset_orgs = load_dataset_orgs(dataset_path)
+    workloads = {'dataset': dataset_orgs, 'synthetic': synthetic_orgs(dataset_orgs)}
+
+    results = []
+    for workload, orgs in workloads.items():
+        for threads in thread_counts:
+            for batch_size in batch_sizes:
+                result = run_config(orgs, batch_size, threads, repeat)
+                result['workload'] = workload
+                results.append(result)
+                print(f"{workload:9s} threads={threads:<3d} batch={batch_size:<4d} "
+                      f"p50={result['p50_ms']:.1f}ms rows/s={result['rows_per_sec']:.1f}", file=sys.stderr)
+
+    return {
+        'created_at': time.time(),
+        'environment': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'backend': fraud_detection.fraud_model.backend,
+            'scoring_mode': fraud_detection.fraud_model.scoring_mode,
+            'model_version': fraud_detection.fraud_model.version,
+            'fine_tuned': fraud_detection.fraud_model.fine_tuned
+        },
+        'results': results
+    }
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float = 0.10) -> List[dict]:
+    """Configs whose rows/sec dropped, or whose p95 latency rose, by more than `tolerance` vs the baseline."""
+    def key(result):
+        return result['workload'], result['batch_size'], result['threads']
+
+    baseline_results = {key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in report['results']:
+        previous = baseline_results.get(key(result))
+        if previous is None:
+            continue
+        if result['rows_per_sec'] < previous['rows_per_sec'] * (1.0 - tolerance):
+            regressions.append({'config': key(result), 'metric': 'rows_per_sec',
+                                'baseline': previous['rows_per_sec'], 'current': result['rows_per_sec']})
+        if result['p95_ms'] > previous['p95_ms'] * (1.0 + tolerance):
+            regressions.append({'config': key(result), 'metric': 'p95_ms',
+                                'baseline': previous['p95_ms'], 'current': result['p95_ms']})
+    return regressions
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+if __name__ == "__main__":
+    cores = os.cpu_count() or 1
+    default_threads = sorted({threads for threads in (1, 2, 4, 8, cores) if threads <= cores})
+
+    parser = argparse.ArgumentParser(description="Benchmark fraud-scoring latency and throughput.")
+    parser.add_argument("--dataset", default=fraud_detection.dataset_path)
+    parser.add_argument("--batch-sizes", type=_int_list, default=[1, 8, 32])
+    parser.add_argument("--threads", type=_int_list, default=default_threads)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--use-cache", action="store_true", help="Leave the prediction cache enabled.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--baseline", help="Compare against this stored report and exit 1 on regressions.")
+    parser.add_argument("--save-baseline", help="Also store this run as the baseline at this path.")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    report = run_benchmark(args.dataset, args.batch_sizes, args.threads, args.repeat, args.use_cache)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        report['baseline'] = args.baseline
+        report['regressions'] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    sys.exit(1 if regressions else 0)
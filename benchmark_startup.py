@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""benchmark_startup.py
+
+Measures what it costs a process to start using fraud_detection.py:
+  - importing the module (each run in a fresh interpreter),
+  - which heavy libraries that import pulled in,
+  - FraudModelLoader.load() and warmup().
+
+Usage:
+    python benchmark_startup.py --runs 5 [--skip-load]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ["torch", "transformers", "datasets", "shap", "matplotlib", "sklearn", "pandas", "numpy"]
+
+IMPORT_PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import fraud_detection
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    'import_seconds': elapsed,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+    'heavy_modules': [m for m in %r if m in sys.modules]
+}))
+""" % (HEAVY_MODULES,)
+
+LOAD_PROBE = """
+import json, resource, time
+import fraud_detection
+started = time.perf_counter()
+fraud_detection.fraud_model.load()
+loaded = time.perf_counter()
+fraud_detection.fraud_model.warmup()
+warmed = time.perf_counter()
+print(json.dumps({
+    'load_seconds': loaded - started,
+    'warmup_seconds': warmed - loaded,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+}))
+"""
+
+
+def _run_probe(code: str) -> dict:
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    # Only the probe's own JSON line matters; the module may print status messages before it
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def benchmark_startup(runs: int = 5, skip_load: bool = False) -> dict:
+    import_runs = [_run_probe(IMPORT_PROBE) for _ in range(runs)]
+    import_seconds = [run['import_seconds'] for run in import_runs]
+    report = {
+        'runs': runs,
+        'import': {
+            'median_ms': statistics.median(import_seconds) * 1000.0,
+            'max_ms': max(import_seconds) * 1000.0,
+            'max_rss_mb': max(run['max_rss_mb'] for run in import_runs),
+            'heavy_modules': import_runs[0]['heavy_modules']
+        }
+    }
+    if not skip_load:
+        report['load'] = _run_probe(LOAD_PROBE)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fraud_detection import and model load time.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-load", action="store_true", help="Only measure the module import.")
+    args = parser.parse_args()
+    print(json.dumps(benchmark_startup(args.runs, args.skip_load), indent=2))
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""benchmark_translation.py
+
+Latency/throughput benchmark for IndicTrans2 translation.
+
+Translates the campaign names and descriptions of ngo_fraud.csv into each
+target language with every combination of engine (see translation_engine.py),
+decoding profile and batch size. Each configuration's report gives p50/p95 latency
+per translate_batch call, the mean latency per text, generated tokens/sec
+and texts/sec as JSON.
+
+Usage:
+    python benchmark_translation.py --engines pytorch,pytorch-int8 --profiles quality,balanced,fast
+    python benchmark_translation.py --engines ctranslate2 --ct2-dir ./indictrans2-ct2-int8 --output bench.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import time
+from typing import List
+
+from benchmark_fraud import peak_rss_mb, percentile
+from translation_engine import DECODING_PROFILES, DEFAULT_MODEL_NAME, ENGINES, load_translator, translate_batch
+
+
+def load_campaign_texts(dataset_path: str) -> List[str]:
+    with open(dataset_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    texts = [row.get(field) for row in rows for field in ('campaign_name', 'campaign_description')]
+    # Unique texts only: translate_batch would otherwise deduplicate part of the workload away
+    return list(dict.fromkeys(text for text in texts if text))
+
+
+def run_config(translator, processor, texts: List[str], languages: List[str], profile: str, batch_size: int) -> dict:
+    latencies_ms = []
+    generated_tokens = 0
+    started = time.perf_counter()
+    for language in languages:
+        for start in range(0, len(texts), batch_size):
+            items = [(text, "en", language) for text in texts[start:start + batch_size]]
+            stats = {}
+            call_started = time.perf_counter()
+            translate_batch(items, translator, processor, profile=profile, max_batch_size=batch_size, stats=stats)
+            latencies_ms.append((time.perf_counter() - call_started) * 1000.0)
+            generated_tokens += stats.get('generated_tokens', 0)
+    elapsed = time.perf_counter() - started
+    translated = len(texts) * len(languages)
+
+    return {
+        'engine': translator.engine,
+        'profile': profile,
+        'num_beams': DECODING_PROFILES[profile]['num_beams'],
+        'batch_size': batch_size,
+        'calls': len(latencies_ms),
+        'texts': translated,
+        'p50_ms': percentile(latencies_ms, 50),
+        'p95_ms': percentile(latencies_ms, 95),
+        'ms_per_text': elapsed * 1000.0 / translated if translated else 0.0,
+        'generated_tokens': generated_tokens,
+        'tokens_per_sec': generated_tokens / elapsed if elapsed else 0.0,
+        'texts_per_sec': translated / elapsed if elapsed else 0.0,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def run_benchmark(dataset_path: str, engines: List[str], profiles: List[str], batch_sizes: List[int],
+                  languages: List[str], model_name: str = DEFAULT_MODEL_NAME, ct2_dir: str = None,
+                  device: str = "cpu", limit: int = 32) -> dict:
+    from IndicTransToolkit.processor import IndicProcessor
+
+    processor = IndicProcessor(build_map_filename=True)
+    texts = load_campaign_texts(dataset_path)[:limit]
+
+    results = []
+    for engine in engines:
+        load_started = time.perf_counter()
+        translator = load_translator(engine, model_name, device, ct2_dir)
+        load_seconds = time.perf_counter() - load_started
+        if translator.engine != engine:
+            print(f"Skipping {engine}: it fell back to {translator.engine}.", file=sys.stderr)
+            continue
+        # One untimed call so the first configuration doesn't pay for allocator/kernel setup
+        translate_batch([(texts[0], "en", languages[0])], translator, processor, profile="fast")
+
+        for profile in profiles:
+            for batch_size in batch_sizes:
+                result = run_config(translator, processor, texts, languages, profile, batch_size)
+                result['load_seconds'] = load_seconds
+                results.append(result)
+                print(f"{engine:13s} {profile:9s} batch={batch_size:<3d} p50={result['p50_ms']:.0f}ms "
+                      f"tokens/s={result['tokens_per_sec']:.1f}", file=sys.stderr)
+        del translator
+
+    return {
+        'created_at': time.time(),
+        'environment': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'device': device,
+            'model_name': model_name,
+            'texts': len(texts),
+            'languages': languages
+        },
+        'results': results
+    }
+
+
+def _list(value: str) -> List[str]:
+    return [part for part in value.split(",") if part]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark IndicTrans2 engines and decoding profiles.")
+    parser.add_argument("--dataset", default="ngo_fraud.csv")
+    parser.add_argument("--engines", type=_list, default=["pytorch", "pytorch-int8"], help=f"Any of {ENGINES}.")
+    parser.add_argument("--profiles", type=_list, default=list(DECODING_PROFILES))
+    parser.add_argument("--batch-sizes", type=lambda value: [int(part) for part in _list(value)], default=[1, 16])
+    parser.add_argument("--languages", type=_list, default=["hi", "ta"])
+    parser.add_argument("--limit", type=int, default=32, help="Texts taken from the dataset.")
+    parser.add_argument("--model-name", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--ct2-dir", default="./indictrans2-ct2-int8")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.dataset, args.engines, args.profiles, args.batch_sizes, args.languages,
+                           args.model_name, args.ct2_dir, args.device, args.limit)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""embedding_store.py
+
+Persistent text-embedding store with near-duplicate search over known fraud.
+
+Every text the transformer scores contributes its mean-pooled DistilBERT
+embedding. Embeddings are L2-normalised and stored as float16 rows of a
+memory-mapped matrix, with parallel memmaps for each row's label and text
+score. Row ids (text hashes) go to an append-only ids.txt, so the store
+survives restarts and costs no load time beyond reading the ids.
+
+Near-duplicate search only considers rows labelled fraud. Up to
+`brute_force_rows` fraud rows are scanned with a single matrix product. Past
+that, an IVF index takes over: spherical k-means centroids, and each query scans
+only the rows of its `nprobe` closest lists. This keeps search fast as the
+store grows to millions of rows. The index is rebuilt in a background thread
+whenever the number of fraud rows has doubled since the last build. Rows
+added in between go into their nearest list.
+
+Several processes (e.g. inference-pool workers) may append at once. Writes are
+serialized with an flock on the store's lock file, and every process picks up
+rows appended by the others on its next search.
+
+Usage:
+    python embedding_store.py stats ./fraud-embeddings/<model version>
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+LABEL_UNKNOWN = -1
+LABEL_LEGITIMATE = 0
+LABEL_FRAUD = 1
+
+
+def normalize_rows(embeddings) -> np.ndarray:
+    embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+class EmbeddingStore:
+    """
+    Append-only, memory-mapped embedding matrix with an id index and fraud near-duplicate search.
+
+    Args:
+        path (str): Directory holding the store's files.
+        dim (int): Embedding width (768 for DistilBERT).
+        nprobe (int): IVF lists scanned per query.
+        brute_force_rows (int): Fraud rows up to which search scans every row instead of the IVF index.
+        check_interval (float): Seconds between checks for rows appended by other processes.
+    """
+
+    def __init__(self, path: str, dim: int = 768, nprobe: int = 8, brute_force_rows: int = 4096,
+                 check_interval: float = 1.0):
+        self.path = path
+        self.dim = dim
+        self.nprobe = nprobe
+        self.brute_force_rows = brute_force_rows
+        self.check_interval = check_interval
+        os.makedirs(path, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._count = 0
+        self._capacity = 0
+        self._label_version = 0
+        self._ids: List[str] = []
+        self._row_of = {}
+        self._ids_offset = 0
+        self._vectors = None
+        self._labels = None
+        self._scores = None
+        self._fraud_rows = np.zeros(0, dtype=np.int64)
+        self._checked_at = 0.0
+
+        # IVF index over the fraud rows
+        self._centroids = None
+        self._lists = None
+        self._indexed_rows = 0
+        self._index_thread = None
+
+        with self._lock:
+            self._refresh(force=True)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self._file(".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self._file("meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'dim': self.dim, 'count': 0, 'capacity': 0, 'label_version': 0}
+
+    def _write_meta(self, meta: dict):
+        tmp_path = self._file(f"meta.json.tmp-{os.getpid()}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._file("meta.json"))
+
+    def _open_arrays(self, capacity: int):
+        if capacity == 0:
+            self._vectors = self._labels = self._scores = None
+        else:
+            self._vectors = np.memmap(self._file("vectors.f16"), dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+            self._labels = np.memmap(self._file("labels.i8"), dtype=np.int8, mode="r+", shape=(capacity,))
+            self._scores = np.memmap(self._file("scores.f32"), dtype=np.float32, mode="r+", shape=(capacity,))
+        self._capacity = capacity
+
+    def _grow(self, capacity: int):
+        """Extends the backing files to `capacity` rows. Must hold the file lock."""
+        for name, row_bytes in (("vectors.f16", 2 * self.dim), ("labels.i8", 1), ("scores.f32", 4)):
+            with open(self._file(name), "a+b") as f:
+                f.truncate(capacity * row_bytes)
+        self._open_arrays(capacity)
+
+    def _refresh(self, force: bool = False):
+        """Picks up rows and label changes written by this or other processes."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+
+        meta = self._read_meta()
+        if meta['dim'] != self.dim:
+            raise ValueError(f"Embedding store at {self.path} holds {meta['dim']}-d vectors, not {self.dim}-d.")
+        if meta['capacity'] != self._capacity:
+            self._open_arrays(meta['capacity'])
+
+        count = meta['count']
+        if count > self._count:
+            with open(self._file("ids.txt"), "rb") as f:
+                f.seek(self._ids_offset)
+                new_ids = f.read().decode("utf-8").splitlines()[:count - self._count]
+                self._ids_offset += sum(len(row_id.encode("utf-8")) + 1 for row_id in new_ids)
+            for row, row_id in enumerate(new_ids, start=self._count):
+                self._row_of[row_id] = row
+            self._ids.extend(new_ids)
+            new_rows = np.arange(self._count, count)
+            self._count = count
+            self._add_fraud_rows(new_rows[np.asarray(self._labels[new_rows]) == LABEL_FRAUD])
+
+        if meta['label_version'] != self._label_version:
+            self._label_version = meta['label_version']
+            self._fraud_rows = np.flatnonzero(np.asarray(self._labels[:self._count]) == LABEL_FRAUD)
+            self._centroids = self._lists = None
+            self._indexed_rows = 0
+
+    def _add_fraud_rows(self, rows: np.ndarray):
+        if not len(rows):
+            return
+        self._fraud_rows = np.concatenate([self._fraud_rows, rows])
+        if self._centroids is not None:
+            assignments = np.argmax(self._rows_as_float(rows) @ self._centroids.T, axis=1)
+            for list_id in np.unique(assignments):
+                self._lists[list_id] = np.concatenate([self._lists[list_id], rows[assignments == list_id]])
+
+    def _rows_as_float(self, rows: np.ndarray) -> np.ndarray:
+        return np.asarray(self._vectors[rows], dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, row_id: str) -> bool:
+        return row_id in self._row_of
+
+    def add(self, ids: Sequence[str], embeddings, labels: Sequence[int], scores: Sequence[float]) -> int:
+        """Appends rows for ids not already in the store. Returns the number of rows added."""
+        embeddings = normalize_rows(embeddings)
+        with self._lock, self._file_lock():
+            self._refresh(force=True)
+            seen = set()
+            new = []
+            for i, row_id in enumerate(ids):
+                if row_id not in self._row_of and row_id not in seen:
+                    seen.add(row_id)
+                    new.append(i)
+            if not new:
+                return 0
+
+            meta = self._read_meta()
+            start, end = meta['count'], meta['count'] + len(new)
+            if end > self._capacity:
+                self._grow(max(end, 2 * self._capacity, 1024))
+                meta['capacity'] = self._capacity
+
+            self._vectors[start:end] = embeddings[new].astype(np.float16)
+            self._labels[start:end] = np.asarray(labels, dtype=np.int8)[new]
+            self._scores[start:end] = np.asarray(scores, dtype=np.float32)[new]
+            for array in (self._vectors, self._labels, self._scores):
+                array.flush()
+            with open(self._file("ids.txt"), "a", encoding="utf-8") as f:
+                f.write("".join(f"{ids[i]}\n" for i in new))
+
+            meta['count'] = end
+            self._write_meta(meta)
+            self._refresh(force=True)
+            return len(new)
+
+    def set_label(self, row_id: str, label: int) -> bool:
+        """Relabels a stored row (e.g. after manual review). Returns False if the id is unknown."""
+        with self._lock, self._file_lock():
+            self._refresh(force=True)
+            row = self._row_of.get(row_id)
+            if row is None:
+                return False
+            self._labels[row] = label
+            self._labels.flush()
+            meta = self._read_meta()
+            meta['label_version'] += 1
+            self._write_meta(meta)
+            self._refresh(force=True)
+            return True
+
+    def _build_index(self, fraud_rows: np.ndarray, label_version: int, iterations: int = 10, seed: int = 42):
+        """Trains spherical k-means centroids on a sample of the fraud rows and assigns every fraud row to a list."""
+        rng = np.random.default_rng(seed)
+        nlist = int(np.clip(np.sqrt(len(fraud_rows)), 16, 65536))
+        sample_rows = np.sort(rng.choice(fraud_rows, size=min(len(fraud_rows), nlist * 32), replace=False))
+        sample = self._rows_as_float(sample_rows)
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            filled = np.bincount(assignments, minlength=nlist) > 0
+            centroids[filled] = normalize_rows(sums[filled])
+
+        assignments = np.concatenate([
+            np.argmax(self._rows_as_float(fraud_rows[start:start + 65536]) @ centroids.T, axis=1)
+            for start in range(0, len(fraud_rows), 65536)
+        ])
+        order = np.argsort(assignments, kind="stable")
+        boundaries = np.searchsorted(assignments[order], np.arange(nlist + 1))
+        lists = [fraud_rows[order[boundaries[i]:boundaries[i + 1]]] for i in range(nlist)]
+
+        with self._lock:
+            if label_version != self._label_version:
+                return # Rows were relabelled meanwhile; the next search starts a fresh build
+            # Fraud rows added while building go into their nearest list
+            added = self._fraud_rows[len(fraud_rows):] if len(self._fraud_rows) >= len(fraud_rows) else np.zeros(0, np.int64)
+            self._centroids, self._lists, self._indexed_rows = centroids, lists, len(fraud_rows)
+            if len(added):
+                assignments = np.argmax(self._rows_as_float(added) @ centroids.T, axis=1)
+                for list_id in np.unique(assignments):
+                    self._lists[list_id] = np.concatenate([self._lists[list_id], added[assignments == list_id]])
+        print(f"Built IVF index over {len(fraud_rows)} fraud embeddings ({nlist} lists).")
+
+    def _maybe_rebuild_index(self):
+        if len(self._fraud_rows) < max(self.brute_force_rows, 2 * self._indexed_rows):
+            return
+        if self._index_thread is not None and self._index_thread.is_alive():
+            return
+        self._index_thread = threading.Thread(target=self._build_index, args=(self._fraud_rows.copy(), self._label_version),
+                                              name="embedding-index", daemon=True)
+        self._index_thread.start()
+
+    def search_fraud(self, embeddings, threshold: float) -> List[Optional[dict]]:
+        """
+        For each embedding, the most similar known-fraud row if its cosine similarity
+        is at least `threshold`, as {'id', 'similarity', 'score'}; otherwise None.
+        """
+        queries = normalize_rows(embeddings)
+        results: List[Optional[dict]] = [None] * len(queries)
+        with self._lock:
+            self._refresh()
+            if not len(self._fraud_rows):
+                return results
+            self._maybe_rebuild_index()
+
+            if self._centroids is None:
+                # Brute force (also used while the first IVF index is being built)
+                best_rows, best_similarities = self._scan(queries, self._fraud_rows)
+            else:
+                probes = np.argsort(-(queries @ self._centroids.T), axis=1)[:, :self.nprobe]
+                best_rows, best_similarities = [], []
+                for query, probe in zip(queries, probes):
+                    rows = np.concatenate([self._lists[list_id] for list_id in probe])
+                    row, similarity = self._scan(query[None, :], rows)
+                    best_rows.append(row[0])
+                    best_similarities.append(similarity[0])
+
+            for i, (row, similarity) in enumerate(zip(best_rows, best_similarities)):
+                if row is not None and similarity >= threshold and self._labels[row] == LABEL_FRAUD:
+                    results[i] = {'id': self._ids[row], 'similarity': float(similarity), 'score': float(self._scores[row])}
+        return results
+
+    def _scan(self, queries: np.ndarray, rows: np.ndarray, chunk_rows: int = 65536) -> tuple:
+        best_rows = [None] * len(queries)
+        best_similarities = np.full(len(queries), -np.inf)
+        for start in range(0, len(rows), chunk_rows):
+            chunk = rows[start:start + chunk_rows]
+            similarities = queries @ self._rows_as_float(chunk).T
+            best = np.argmax(similarities, axis=1)
+            for i, column in enumerate(best):
+                if similarities[i, column] > best_similarities[i]:
+                    best_similarities[i] = similarities[i, column]
+                    best_rows[i] = int(chunk[column])
+        return best_rows, best_similarities
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return {
+                'path': self.path,
+                'rows': self._count,
+                'fraud_rows': int(len(self._fraud_rows)),
+                'capacity': self._capacity,
+                'index': 'ivf' if self._centroids is not None else 'brute-force',
+                'ivf_lists': len(self._lists) if self._lists is not None else 0,
+                'nprobe': self.nprobe
+            }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect a fraud embedding store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    stats_parser = subparsers.add_parser("stats", help="Print row counts and index state.")
+    stats_parser.add_argument("path")
+    args = parser.parse_args()
+    with open(os.path.join(args.path, "meta.json"), encoding="utf-8") as f:
+        dim = json.load(f)['dim']
+    print(json.dumps(EmbeddingStore(args.path, dim=dim).stats(), indent=2))
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""explanation_jobs.py
+
+Background SHAP explanations for fraud predictions.
+
+Explaining a transformer with SHAP takes hundreds of forward passes, so it
+never runs inline with a request. Jobs are identified by the hash of the
+normalized input text and the model version that explains it: the same text
+always maps to the same job id until a new model is swapped in, and a
+finished explanation (token attributions JSON + rendered plot) is written to
+the artifact directory and served from there for every later request.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from prediction_cache import normalize_text
+
+DEFAULT_ARTIFACT_DIR = "./shap_artifacts"
+
+_JOB_ID = re.compile(r"^[0-9a-f]{64}$")
+
+
+def explanation_id(text: str, model_version: str = "") -> str:
+    """Deterministic job/artifact id for an input text explained by `model_version` ("" for the text alone)."""
+    key = normalize_text(text) + (f"\n{model_version}" if model_version else "")
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def artifact_paths(job_id: str, artifact_dir: str = DEFAULT_ARTIFACT_DIR) -> tuple:
+    """(attributions JSON path, plot PNG path) for a job id."""
+    return os.path.join(artifact_dir, f"{job_id}.json"), os.path.join(artifact_dir, f"{job_id}.png")
+
+
+class ExplanationJobQueue:
+    """
+    Runs `explain_fn(text, plot_path, model) -> dict` on a background worker pool and caches the results on disk.
+
+    Args:
+        explain_fn (callable): Computes token attributions for a text with `model` and renders the plot to plot_path.
+        artifact_dir (str): Where finished explanations are written.
+        max_workers (int): Number of explanation worker threads.
+        max_finished_jobs (int): Finished jobs whose status is kept in memory (their artifacts stay on disk).
+    """
+
+    def __init__(self, explain_fn: Callable[[str, str, Any], dict], artifact_dir: str = DEFAULT_ARTIFACT_DIR,
+                 max_workers: int = 1, max_finished_jobs: int = 10000):
+        self.explain_fn = explain_fn
+        self.artifact_dir = artifact_dir
+        self.max_finished_jobs = max_finished_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shap-explainer")
+        self._jobs = collections.OrderedDict()
+        self._finished = 0
+        self._lock = threading.Lock()
+        os.makedirs(artifact_dir, exist_ok=True)
+
+    def submit(self, text: str, model: Any = None) -> str:
+        """
+        Queues an explanation of `text` by `model` (an object with a `version`, passed on
+        to explain_fn) unless one is already finished or in progress. Returns the job id.
+        """
+        # The id and the explanation both come from this one model, even if another is swapped in meanwhile
+        job_id = explanation_id(text, getattr(model, 'version', None) or "")
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job['status'] != 'failed':
+                return job_id
+            if os.path.exists(artifact_paths(job_id, self.artifact_dir)[0]):
+                return job_id
+
+            if job is not None:
+                self._finished -= 1
+            self._jobs[job_id] = {'status': 'queued', 'submitted_at': time.time(), 'error': None}
+            self._jobs.move_to_end(job_id)
+        self._executor.submit(self._run, job_id, text, model)
+        return job_id
+
+    def _finish(self, job_id: str, **fields):
+        # Caller holds self._lock. Drops the oldest finished jobs; done ones are still served from disk
+        self._jobs[job_id].update(fields)
+        self._finished += 1
+        if self._finished > self.max_finished_jobs:
+            for old_id in [old_id for old_id, job in self._jobs.items() if job['status'] in ('done', 'failed')]:
+                if self._finished <= self.max_finished_jobs // 2:
+                    break
+                del self._jobs[old_id]
+                self._finished -= 1
+
+    def _run(self, job_id: str, text: str, model: Any):
+        json_path, plot_path = artifact_paths(job_id, self.artifact_dir)
+        with self._lock:
+            self._jobs[job_id]['status'] = 'running'
+        started = time.perf_counter()
+        try:
+            explanation = self.explain_fn(text, plot_path, model)
+            explanation['seconds'] = time.perf_counter() - started
+
+            # Write-then-rename so pollers never read a half-written artifact
+            tmp_path = json_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(explanation, f)
+            os.replace(tmp_path, json_path)
+
+            with self._lock:
+                self._finish(job_id, status='done')
+        except Exception as e:
+            print(f"Error computing SHAP explanation {job_id}: {e}")
+            with self._lock:
+                self._finish(job_id, status='failed', error=str(e))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Returns the job's status, plus the attributions and plot path once finished; None if unknown."""
+        if not _JOB_ID.match(job_id):
+            return None
+        json_path, plot_path = artifact_paths(job_id, self.artifact_dir)
+        if os.path.exists(json_path):
+            with open(json_path, encoding="utf-8") as f:
+                explanation = json.load(f)
+            return {
+                'job_id': job_id,
+                'status': 'done',
+                'explanation': explanation,
+                'plot_path': plot_path if os.path.exists(plot_path) else None
+            }
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {'job_id': job_id, 'status': job['status'], 'error': job['error']}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""fraud_cascade.py
+
+Cheap lexical first stage for the two-stage fraud scorer.
+
+A hashed word/character n-gram TF-IDF + logistic regression model, trained on
+the same ngo_fraud.csv as DistilBERT, answers the obvious cases. Only texts
+whose lexical score falls inside the uncertainty band are escalated to the
+transformer (FRAUD_SCORING_MODE=cascade in fraud_detection.py).
+
+Usage:
+    python fraud_cascade.py train
+    python fraud_cascade.py benchmark --band 0.2 0.8
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_LEXICAL_MODEL_PATH = "./lexical-fraud-model.joblib"
+
+
+class LexicalFraudModel:
+    """Hashed n-gram TF-IDF features fed to a logistic regression; needs no vocabulary fitting pass."""
+
+    def __init__(self, n_features: int = 2 ** 18, C: float = 4.0):
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline, make_union
+
+        features = make_union(
+            HashingVectorizer(analyzer="word", ngram_range=(1, 2), n_features=n_features,
+                              alternate_sign=False, lowercase=True),
+            HashingVectorizer(analyzer="char_wb", ngram_range=(3, 5), n_features=n_features,
+                              alternate_sign=False, lowercase=True)
+        )
+        self.pipeline = make_pipeline(
+            features,
+            TfidfTransformer(sublinear_tf=True),
+            LogisticRegression(C=C, class_weight="balanced", max_iter=1000)
+        )
+
+    def fit(self, texts: List[str], labels: List[int]) -> "LexicalFraudModel":
+        self.pipeline.fit(texts, labels)
+        return self
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """Returns the probability of fraud (label 1) for each text."""
+        return self.pipeline.predict_proba(texts)[:, 1]
+
+    def save(self, path: str = DEFAULT_LEXICAL_MODEL_PATH):
+        import joblib
+        joblib.dump(self, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_LEXICAL_MODEL_PATH) -> "LexicalFraudModel":
+        import joblib
+        return joblib.load(path)
+
+
+def train_lexical_model(dataset_path: str = "ngo_fraud.csv",
+                        model_path: Optional[str] = DEFAULT_LEXICAL_MODEL_PATH) -> LexicalFraudModel:
+    """Trains the lexical model on the 'text' and 'label' columns of `dataset_path` and saves it to `model_path`."""
+    import pandas as pd
+
+    df = pd.read_csv(dataset_path)
+    if 'text' not in df.columns or 'label' not in df.columns:
+        raise ValueError("Dataset must contain 'text' and 'label' columns.")
+
+    lexical_model = LexicalFraudModel().fit(df['text'].astype(str).tolist(), df['label'].astype(int).tolist())
+    if model_path:
+        lexical_model.save(model_path)
+        print(f"Lexical fraud model saved to {model_path}")
+    return lexical_model
+
+
+def load_or_train_lexical_model(model_path: str = DEFAULT_LEXICAL_MODEL_PATH,
+                                dataset_path: str = "ngo_fraud.csv") -> Optional[LexicalFraudModel]:
+    """Loads the saved lexical model, training it first if needed. Returns None if neither is possible."""
+    try:
+        if os.path.exists(model_path):
+            return LexicalFraudModel.load(model_path)
+        print(f"Training lexical fraud model from {dataset_path}...")
+        return train_lexical_model(dataset_path, model_path)
+    except Exception as e:
+        print(f"Error loading lexical fraud model: {e}")
+        return None
+
+
+def split_by_band(lexical_scores: np.ndarray, low: float, high: float) -> List[int]:
+    """Indices of the scores strictly inside (low, high), i.e. the inputs to escalate to the transformer."""
+    return [i for i, score in enumerate(lexical_scores) if low < score < high]
+
+
+def benchmark_cascade(dataset_path: str = "ngo_fraud.csv", low: float = 0.2, high: float = 0.8,
+                      repeat: int = 3) -> dict:
+    """
+    Scores every text in `dataset_path` with the transformer alone and with the
+    cascade, and reports the escalation rate, speedup and agreement of the two.
+    """
+    import pandas as pd
+    import fraud_detection
+
+    texts = pd.read_csv(dataset_path)['text'].astype(str).tolist()
+    lexical_model = fraud_detection.fraud_model.load().lexical_model or load_or_train_lexical_model(dataset_path=dataset_path)
+
+    def timed(fn):
+        best = float("inf")
+        result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - started)
+        return best, result
+
+    transformer_seconds, transformer_scores = timed(lambda: fraud_detection._score_texts(texts))
+    cascade_seconds, (cascade_scores, stages) = timed(
+        lambda: fraud_detection._score_texts_cascade(texts, lexical_model, band=(low, high)))
+
+    escalated = stages.count('transformer')
+    agreement = np.mean([(a > 0.5) == (b > 0.5) for a, b in zip(transformer_scores, cascade_scores)])
+    return {
+        'dataset': dataset_path,
+        'rows': len(texts),
+        'band': [low, high],
+        'escalated': escalated,
+        'escalation_rate': escalated / len(texts) if texts else 0.0,
+        'transformer_seconds': transformer_seconds,
+        'cascade_seconds': cascade_seconds,
+        'speedup': transformer_seconds / cascade_seconds if cascade_seconds else None,
+        'label_agreement': float(agreement)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train or benchmark the lexical first stage of the fraud cascade.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="Train the lexical model from a labelled CSV.")
+    train_parser.add_argument("--dataset", default="ngo_fraud.csv")
+    train_parser.add_argument("--model-path", default=DEFAULT_LEXICAL_MODEL_PATH)
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="Report escalation rate and speedup of the cascade.")
+    benchmark_parser.add_argument("--dataset", default="ngo_fraud.csv")
+    benchmark_parser.add_argument("--band", type=float, nargs=2, default=[0.2, 0.8], metavar=("LOW", "HIGH"))
+    benchmark_parser.add_argument("--repeat", type=int, default=3)
+
+    args = parser.parse_args()
+    if args.command == "train":
+        train_lexical_model(args.dataset, args.model_path)
+    else:
+        print(json.dumps(benchmark_cascade(args.dataset, args.band[0], args.band[1], args.repeat), indent=2))
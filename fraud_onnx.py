@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""fraud_onnx.py
+
+ONNX Runtime backends for the fine-tuned DistilBERT fraud model.
+
+Usage:
+    python fraud_onnx.py export     # ./distilbert-fraud-finetuned -> ./distilbert-fraud-onnx (fp32 + int8)
+    python fraud_onnx.py parity     # compare both ONNX backends against PyTorch on ngo_fraud.csv
+
+Select the backend used by predict_fraud with FRAUD_INFERENCE_BACKEND=pytorch|onnx|onnx-int8.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_MODEL_DIR = "./distilbert-fraud-finetuned"
+DEFAULT_ONNX_DIR = "./distilbert-fraud-onnx"
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model.int8.onnx"
+
+BACKENDS = ("pytorch", "onnx", "onnx-int8")
+
+
+def export_onnx_model(model_dir: str = DEFAULT_MODEL_DIR, onnx_dir: str = DEFAULT_ONNX_DIR,
+                      quantize: bool = True, opset_version: int = 14) -> dict:
+    """
+    Exports the fine-tuned checkpoint to an ONNX graph with dynamic batch and
+    sequence axes, plus a dynamically int8-quantized copy.
+
+    Args:
+        model_dir (str): Directory holding the fine-tuned Hugging Face checkpoint.
+        onnx_dir (str): Output directory for the ONNX graphs and tokenizer files.
+        quantize (bool): Also write the int8 dynamically quantized graph.
+        opset_version (int): ONNX opset to export with.
+
+    Returns:
+        dict: Paths of the written graphs.
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    os.makedirs(onnx_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir, num_labels=2)
+    model.eval()
+    model.config.return_dict = False
+
+    sample = tokenizer(["Dedicated to providing education for underprivileged children."], return_tensors="pt")
+    onnx_path = os.path.join(onnx_dir, ONNX_MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            onnx_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch"}
+            },
+            opset_version=opset_version,
+            do_constant_folding=True
+        )
+    tokenizer.save_pretrained(onnx_dir)
+    paths = {'onnx': onnx_path}
+    print(f"Exported ONNX fraud model to {onnx_path}")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        int8_path = os.path.join(onnx_dir, ONNX_INT8_MODEL_FILE)
+        quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QInt8)
+        paths['onnx-int8'] = int8_path
+        print(f"Wrote int8 dynamically quantized fraud model to {int8_path}")
+
+    return paths
+
+
+class OnnxFraudModel:
+    """Runs an exported fraud graph on onnxruntime's CPU provider and returns logits like the PyTorch model."""
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.model_path = model_path
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+    def logits(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        return self.session.run(["logits"], {
+            "input_ids": input_ids.astype(np.int64),
+            "attention_mask": attention_mask.astype(np.int64)
+        })[0]
+
+
+def load_onnx_model(backend: str, onnx_dir: str = DEFAULT_ONNX_DIR,
+                    num_threads: Optional[int] = None) -> Optional[OnnxFraudModel]:
+    """Loads the graph for `backend` ('onnx' or 'onnx-int8'), or returns None if it has not been exported."""
+    filename = ONNX_INT8_MODEL_FILE if backend == "onnx-int8" else ONNX_MODEL_FILE
+    model_path = os.path.join(onnx_dir, filename)
+    if not os.path.exists(model_path):
+        print(f"Warning: {model_path} not found. Run 'python fraud_onnx.py export' to build the {backend} backend.")
+        return None
+    return OnnxFraudModel(model_path, num_threads=num_threads)
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def check_backend_parity(dataset_path: str = "ngo_fraud.csv", model_dir: str = DEFAULT_MODEL_DIR,
+                         onnx_dir: str = DEFAULT_ONNX_DIR, tolerance: float = 0.05) -> dict:
+    """
+    Scores every text in `dataset_path` with PyTorch and with each exported ONNX
+    backend, and checks the fraud probabilities agree within `tolerance`.
+
+    Returns:
+        dict: Per-backend max/mean absolute probability difference, label
+        agreement rate and whether the backend passed.
+    """
+    import pandas as pd
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    texts: List[str] = pd.read_csv(dataset_path)["text"].astype(str).tolist()
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    inputs = tokenizer(texts, truncation=True, padding="longest", return_tensors="np")
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir, num_labels=2)
+    model.eval()
+    with torch.no_grad():
+        reference_logits = model(
+            input_ids=torch.from_numpy(inputs["input_ids"]),
+            attention_mask=torch.from_numpy(inputs["attention_mask"])
+        ).logits.numpy()
+    reference = softmax(reference_logits)[:, 1]
+
+    report = {'dataset': dataset_path, 'rows': len(texts), 'tolerance': tolerance, 'backends': {}}
+    for backend in ("onnx", "onnx-int8"):
+        onnx_model = load_onnx_model(backend, onnx_dir)
+        if onnx_model is None:
+            report['backends'][backend] = {'passed': False, 'error': 'not exported'}
+            continue
+        scores = softmax(onnx_model.logits(inputs["input_ids"], inputs["attention_mask"]))[:, 1]
+        diff = np.abs(scores - reference)
+        report['backends'][backend] = {
+            'max_abs_diff': float(diff.max()),
+            'mean_abs_diff': float(diff.mean()),
+            'label_agreement': float(((scores > 0.5) == (reference > 0.5)).mean()),
+            'passed': bool(diff.max() <= tolerance)
+        }
+    report['passed'] = all(result['passed'] for result in report['backends'].values())
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export and validate ONNX backends for the fraud model.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export the fine-tuned checkpoint to ONNX (fp32 + int8).")
+    export_parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR)
+    export_parser.add_argument("--onnx-dir", default=DEFAULT_ONNX_DIR)
+    export_parser.add_argument("--no-quantize", action="store_true")
+
+    parity_parser = subparsers.add_parser("parity", help="Check ONNX backends agree with PyTorch.")
+    parity_parser.add_argument("--dataset", default="ngo_fraud.csv")
+    parity_parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR)
+    parity_parser.add_argument("--onnx-dir", default=DEFAULT_ONNX_DIR)
+    parity_parser.add_argument("--tolerance", type=float, default=0.05)
+
+    args = parser.parse_args()
+    if args.command == "export":
+        export_onnx_model(args.model_dir, args.onnx_dir, quantize=not args.no_quantize)
+    else:
+        parity_report = check_backend_parity(args.dataset, args.model_dir, args.onnx_dir, args.tolerance)
+        print(json.dumps(parity_report, indent=2))
+        sys.exit(0 if parity_report['passed'] else 1)
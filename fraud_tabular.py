@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""fraud_tabular.py
+
+Numeric-feature scoring stage and learned score blend for the fraud model.
+
+The account features of an organization (follower_count, post_count,
+account_age_days, engagement_rate) are extracted for a whole batch into one
+NumPy matrix and scored by a small logistic regression in a single call. A
+second logistic regression, the blender, then combines the transformer's text
+score, this tabular score, the verification outcome and (if the training data
+had it) the TrustCheckr score. Its coefficients replace the hand-picked +0.2
+verification penalty and 0.6/0.4 TrustCheckr blend in fraud_detection.py.
+
+Training needs labelled rows that have the numeric columns, e.g. the review
+outcomes exported by incremental_update.py. ngo_fraud.csv does not have them.
+Text scores come from a 'text_score' column if there is one. Otherwise the
+live transformer scores the 'text' column.
+
+Usage:
+    python fraud_tabular.py train --dataset reviews.csv
+    python fraud_tabular.py weights
+"""
+
+import argparse
+import json
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_TABULAR_MODEL_PATH = "./tabular-fraud-model.joblib"
+
+FEATURE_NAMES = ('follower_count', 'post_count', 'account_age_days', 'engagement_rate')
+COUNT_FEATURES = 3 # The first three are heavy-tailed counts and get log-scaled
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def extract_features(organizations: Sequence[dict]) -> np.ndarray:
+    """(n, 4) float matrix of FEATURE_NAMES for a batch of organization dicts; missing values are 0."""
+    count = len(organizations)
+    return np.column_stack([
+        np.fromiter((_as_float(org.get(name)) for org in organizations), dtype=np.float64, count=count)
+        for name in FEATURE_NAMES
+    ]) if count else np.zeros((0, len(FEATURE_NAMES)))
+
+
+def transform_features(features: np.ndarray) -> np.ndarray:
+    """log1p on the counts and clipping of engagement_rate to [0, 1], column-wise for the whole batch."""
+    transformed = np.empty_like(features, dtype=np.float64)
+    transformed[:, :COUNT_FEATURES] = np.log1p(np.clip(features[:, :COUNT_FEATURES], 0.0, None))
+    transformed[:, COUNT_FEATURES:] = np.clip(features[:, COUNT_FEATURES:], 0.0, 1.0)
+    return transformed
+
+
+def logit(probabilities: np.ndarray, eps: float = 1e-4) -> np.ndarray:
+    probabilities = np.clip(np.asarray(probabilities, dtype=np.float64), eps, 1.0 - eps)
+    return np.log(probabilities / (1.0 - probabilities))
+
+
+class TabularFraudModel:
+    """Logistic regression on the account features plus a logistic-regression blender over all score sources."""
+
+    def __init__(self, C: float = 1.0):
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+        self.tabular = make_pipeline(
+            FunctionTransformer(transform_features),
+            StandardScaler(),
+            LogisticRegression(C=C, class_weight="balanced", max_iter=1000)
+        )
+        self.blender = LogisticRegression(max_iter=1000)
+        self.blend_features = ['text_logit', 'tabular_logit', 'verification_failed']
+
+    def _blend_matrix(self, text_scores: np.ndarray, tabular_scores: np.ndarray, verification_failed: np.ndarray,
+                      trustcheckr_scores: Optional[np.ndarray]) -> np.ndarray:
+        columns = [logit(text_scores), logit(tabular_scores), np.asarray(verification_failed, dtype=np.float64)]
+        if 'trustcheckr' in self.blend_features:
+            trustcheckr = np.asarray(trustcheckr_scores if trustcheckr_scores is not None
+                                     else np.full(len(text_scores), np.nan), dtype=np.float64)
+            missing = np.isnan(trustcheckr)
+            columns += [np.where(missing, 0.5, trustcheckr), missing.astype(np.float64)]
+        return np.column_stack(columns)
+
+    def fit(self, features: np.ndarray, text_scores: np.ndarray, verification_failed: np.ndarray,
+            labels: np.ndarray, trustcheckr_scores: Optional[np.ndarray] = None) -> "TabularFraudModel":
+        from sklearn.model_selection import cross_val_predict
+
+        labels = np.asarray(labels, dtype=int)
+        # Both logistic regressions need fraud and legitimate examples
+        classes = np.unique(labels)
+        if not np.array_equal(classes, [0, 1]):
+            raise ValueError(f"The tabular model needs labels 0 and 1 in the training data, got {classes.tolist()}; "
+                             f"export more reviewed rows and retrain.")
+        self.tabular.fit(features, labels)
+
+        # Fit the blender on out-of-fold tabular scores so it doesn't over-trust a stage that saw the labels
+        folds = int(min(5, np.bincount(labels).min()))
+        tabular_scores = (cross_val_predict(self.tabular, features, labels, cv=folds, method="predict_proba")[:, 1]
+                          if folds >= 2 else self.tabular.predict_proba(features)[:, 1])
+
+        if trustcheckr_scores is not None and not np.all(np.isnan(trustcheckr_scores)):
+            self.blend_features = ['text_logit', 'tabular_logit', 'verification_failed',
+                                   'trustcheckr', 'trustcheckr_missing']
+        self.blender.fit(self._blend_matrix(text_scores, tabular_scores, verification_failed, trustcheckr_scores),
+                         labels)
+        return self
+
+    def tabular_proba(self, features: np.ndarray) -> np.ndarray:
+        """Returns the probability of fraud (label 1) from the account features alone."""
+        return self.tabular.predict_proba(features)[:, 1]
+
+    def blend(self, text_scores: Sequence[float], features: np.ndarray, verification_failed: Sequence[bool],
+              trustcheckr_scores: Optional[Sequence[float]] = None) -> tuple:
+        """
+        Scores a whole batch in two vectorized calls.
+
+        Returns:
+            tuple: (fraud_scores, tabular_scores) as arrays aligned with the inputs.
+        """
+        text_scores = np.asarray(text_scores, dtype=np.float64)
+        tabular_scores = self.tabular_proba(features)
+        matrix = self._blend_matrix(text_scores, tabular_scores, np.asarray(verification_failed), trustcheckr_scores)
+        return self.blender.predict_proba(matrix)[:, 1], tabular_scores
+
+    def blend_weights(self) -> dict:
+        weights = dict(zip(self.blend_features, (float(w) for w in self.blender.coef_[0])))
+        weights['intercept'] = float(self.blender.intercept_[0])
+        return weights
+
+    def save(self, path: str = DEFAULT_TABULAR_MODEL_PATH):
+        import joblib
+        joblib.dump(self, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TABULAR_MODEL_PATH) -> "TabularFraudModel":
+        import joblib
+        return joblib.load(path)
+
+
+def load_tabular_model(path: str = DEFAULT_TABULAR_MODEL_PATH) -> Optional[TabularFraudModel]:
+    """Loads the saved model, or returns None (hand-tuned blend) if there isn't a usable one."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return TabularFraudModel.load(path)
+    except Exception as e:
+        print(f"Error loading tabular fraud model: {e}")
+        return None
+
+
+def train_tabular_model(dataset_path: str, model_path: Optional[str] = DEFAULT_TABULAR_MODEL_PATH) -> TabularFraudModel:
+    """Trains the tabular stage and blender on `dataset_path` (see the module docstring) and saves it to `model_path`."""
+    import pandas as pd
+    import fraud_detection
+
+    df = pd.read_csv(dataset_path)
+    missing_columns = [name for name in ('label',) + FEATURE_NAMES if name not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Dataset is missing columns required for the tabular model: {missing_columns}")
+    if 'text_score' not in df.columns and 'text' not in df.columns:
+        raise ValueError("Dataset must contain a 'text_score' or a 'text' column.")
+
+    rows: List[dict] = df.where(pd.notnull(df), None).to_dict('records')
+    if 'text_score' in df.columns:
+        text_scores = df['text_score'].astype(float).to_numpy()
+    else:
+        print(f"Scoring {len(rows)} texts with the transformer...")
+        text_scores = np.asarray(fraud_detection._score_texts([str(row['text']) for row in rows]))
+
+    verifications = [fraud_detection._verify_organization(row) for row in rows]
+    verification_failed = np.fromiter((fraud_detection.verification_failed(v) for v in verifications),
+                                      dtype=bool, count=len(rows))
+    trustcheckr_scores = df['trustcheckr_score'].astype(float).to_numpy() if 'trustcheckr_score' in df.columns else None
+
+    tabular_model = TabularFraudModel().fit(extract_features(rows), text_scores, verification_failed,
+                                            df['label'].astype(int).to_numpy(), trustcheckr_scores)
+    print(f"Learned blend weights: {json.dumps(tabular_model.blend_weights())}")
+    if model_path:
+        tabular_model.save(model_path)
+        print(f"Tabular fraud model saved to {model_path}")
+    return tabular_model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train or inspect the numeric-feature fraud stage and score blender.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="Train from a labelled CSV with the numeric feature columns.")
+    train_parser.add_argument("--dataset", required=True)
+    train_parser.add_argument("--model-path", default=DEFAULT_TABULAR_MODEL_PATH)
+
+    weights_parser = subparsers.add_parser("weights", help="Print the learned blend weights.")
+    weights_parser.add_argument("--model-path", default=DEFAULT_TABULAR_MODEL_PATH)
+
+    args = parser.parse_args()
+    if args.command == "train":
+        train_tabular_model(args.dataset, args.model_path)
+    else:
+        print(json.dumps(TabularFraudModel.load(args.model_path).blend_weights(), indent=2))
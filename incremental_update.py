@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""incremental_update.py
+
+Incremental fraud-model updates from manual-review outcomes.
+
+Organizations scored into "Needs Manual Review" are labelled by reviewers
+(review_label 0 = legitimate, 1 = fraud) in the organization_verifications
+collection. This job fine-tunes the currently published checkpoint on the
+reviews not yet seen by it, mixed with a small replay sample of the original
+dataset so the model doesn't drift away from what it already knew, and
+publishes the result as a new version (see model_versions.py).
+
+Each version records the newest review it was trained on ('reviewed_through'),
+so the next update only picks up reviews made after it. A full retrain from
+ngo_fraud.csv resets this, and its first incremental update replays every review.
+
+Usage:
+    python incremental_update.py --reviews reviews.csv --dataset ngo_fraud.csv
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import sys
+import time
+from typing import List, Optional
+
+import fraud_detection
+from fraud_tabular import FEATURE_NAMES
+from model_versions import (current_version_dir, new_version_dir, prune_versions, publish_version,
+                            read_version_metadata, write_version_metadata)
+
+# The account features make the exported CSV usable by `fraud_tabular.py train` as well
+REVIEW_FIELDS = ('doc_id', 'text', 'label', 'reviewed_at') + FEATURE_NAMES
+
+
+def reviewed_through(model_root: str = fraud_detection.model_root) -> float:
+    """Review timestamp up to which the published version has already been trained."""
+    return float(read_version_metadata(current_version_dir(model_root)).get('reviewed_through', 0.0))
+
+
+def fetch_review_examples(verification_collection, reviewed_after: float = 0.0) -> List[dict]:
+    """Labelled reviews from the organization_verifications collection made after `reviewed_after`."""
+    examples = []
+    for doc in verification_collection.where("review_label", "in", [0, 1]).stream():
+        data = doc.to_dict()
+        reviewed_at = data.get('reviewed_at')
+        reviewed_at = reviewed_at.timestamp() if hasattr(reviewed_at, 'timestamp') else float(reviewed_at or 0.0)
+        # Verifications stored before the text was recorded can't be trained on
+        if reviewed_at <= reviewed_after or not data.get('text'):
+            continue
+        account_features = data.get('account_features') or {}
+        examples.append({'doc_id': doc.id, 'text': data['text'], 'label': int(data['review_label']),
+                         'reviewed_at': reviewed_at,
+                         **{name: account_features.get(name, 0) for name in FEATURE_NAMES}})
+    return examples
+
+
+def write_review_examples(examples: List[dict], path: str):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=REVIEW_FIELDS)
+        writer.writeheader()
+        writer.writerows(examples)
+
+
+def read_review_examples(path: str) -> List[dict]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            {'doc_id': row['doc_id'], 'text': row['text'], 'label': int(row['label']),
+             'reviewed_at': float(row['reviewed_at'] or 0.0),
+             **{name: float(row.get(name) or 0.0) for name in FEATURE_NAMES}}
+            for row in csv.DictReader(f)
+        ]
+
+
+def replay_sample(dataset_path: str, size: int, seed: int = 42) -> tuple:
+    """Class-balanced sample of (texts, labels) from the original training CSV."""
+    import pandas as pd
+
+    if size <= 0 or not os.path.exists(dataset_path):
+        return [], []
+    df = pd.read_csv(dataset_path)[['text', 'label']].dropna()
+    per_label = max(1, size // max(1, df['label'].nunique()))
+    sample = df.groupby('label', group_keys=False).apply(
+        lambda group: group.sample(n=min(len(group), per_label), random_state=seed))
+    return sample['text'].astype(str).tolist(), sample['label'].astype(int).tolist()
+
+
+def incremental_update(reviews_path: str, dataset_path: str = fraud_detection.dataset_path,
+                       model_root: str = fraud_detection.model_root, replay_ratio: float = 2.0,
+                       min_replay: int = 32, epochs: int = 1, keep: int = 3,
+                       export_onnx: bool = False) -> Optional[str]:
+    """
+    Fine-tunes the published checkpoint on the reviews in `reviews_path` plus
+    replay_ratio times as many replayed examples, optionally exports its ONNX
+    graphs, then publishes the new version.
+    Returns the new version directory, or None if there was nothing to train.
+    """
+    examples = read_review_examples(reviews_path)
+    if not examples:
+        print("No new review outcomes; nothing to update.")
+        return None
+
+    base_model_dir = current_version_dir(model_root) or fraud_detection.output_dir
+    if not os.path.isdir(base_model_dir):
+        print(f"No fine-tuned checkpoint at {base_model_dir}; run train_fraud_model.py first.")
+        return None
+
+    replay_texts, replay_labels = replay_sample(dataset_path, max(min_replay, int(len(examples) * replay_ratio)))
+    texts = [example['text'] for example in examples] + replay_texts
+    labels = [example['label'] for example in examples] + replay_labels
+
+    started = time.perf_counter()
+    version_dir = new_version_dir(model_root)
+    try:
+        fraud_detection.fine_tune_incremental(texts, labels, base_model_dir, version_dir, epochs=epochs)
+        if export_onnx:
+            from fraud_onnx import export_onnx_model
+            export_onnx_model(version_dir, f"{version_dir}/onnx")
+        write_version_metadata(version_dir, {
+            'kind': 'incremental',
+            'parent': os.path.basename(os.path.normpath(base_model_dir)),
+            'review_examples': len(examples),
+            'replay_examples': len(replay_texts),
+            'reviewed_through': max(example['reviewed_at'] for example in examples),
+            'created_at': time.time()
+        })
+    except Exception:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    finally:
+        shutil.rmtree(f"{version_dir}-checkpoints", ignore_errors=True)
+
+    publish_version(version_dir, model_root)
+    prune_versions(model_root, keep=keep)
+    print(f"Incremental update on {len(examples)} reviews + {len(replay_texts)} replayed examples "
+          f"took {time.perf_counter() - started:.1f}s.")
+    return version_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fine-tune the published fraud model on new review outcomes.")
+    parser.add_argument("--reviews", required=True, help="CSV of review outcomes (doc_id,text,label,reviewed_at).")
+    parser.add_argument("--dataset", default=fraud_detection.dataset_path, help="Original dataset for replay.")
+    parser.add_argument("--model-root", default=fraud_detection.model_root)
+    parser.add_argument("--replay-ratio", type=float, default=2.0)
+    parser.add_argument("--min-replay", type=int, default=32)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--keep", type=int, default=3)
+    parser.add_argument("--export-onnx", action="store_true", help="Also export fp32/int8 ONNX graphs into the version.")
+    args = parser.parse_args()
+
+    published = incremental_update(args.reviews, args.dataset, args.model_root, args.replay_ratio,
+                                   args.min_replay, args.epochs, args.keep, args.export_onnx)
+    sys.exit(0 if published else 1)
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""inference_pool.py
+
+Multi-core process-pool tier for model inference.
+
+Models are loaded in the parent process before the workers are forked, so the
+weights are shared copy-on-write instead of being loaded once per worker.
+fork() only copies the calling thread, so workers are forked only while the
+parent has no other threads. A pool started later (e.g. restarted after a model
+swap from the watcher thread) uses the forkserver start method instead, and its
+workers load the models themselves with worker_init; callers can check
+start_method to keep models that worker_init doesn't load out of such a pool.
+Each worker caps its torch intra-op threads so workers don't oversubscribe
+the cores, and async endpoints await results without blocking the event loop.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+def _init_worker(torch_threads: int, worker_init: Optional[Callable[[], Any]] = None):
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    if worker_init is not None:
+        worker_init()
+
+
+def _timed_call(fn: Callable, args: tuple) -> tuple:
+    started = time.perf_counter()
+    result = fn(*args)
+    return os.getpid(), time.perf_counter() - started, result
+
+
+def _collect_call(fn: Callable, linger: float) -> tuple:
+    result = fn()
+    # Stay busy briefly so the remaining collect tasks go to the other workers
+    time.sleep(linger)
+    return os.getpid(), result
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+class InferencePool:
+    """
+    Fork-based process pool that tracks how busy each worker is.
+
+    Args:
+        workers (int): Number of worker processes.
+        torch_threads (int): torch.set_num_threads() value inside each worker.
+        worker_init (callable): Picklable module-level function that loads the models in a
+            worker that wasn't forked from them (see start).
+    """
+
+    def __init__(self, workers: int = 2, torch_threads: int = 1, worker_init: Optional[Callable[[], Any]] = None):
+        self.workers = workers
+        self.torch_threads = torch_threads
+        self.worker_init = worker_init
+        self.start_method = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._started_at = None
+        self._worker_stats: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self, preload: Optional[Callable[[], Any]] = None):
+        """
+        Runs `preload` (which should load every model the workers need) and then
+        forks all workers at once, so they inherit the already-loaded weights.
+        Call it before starting any other thread; otherwise the workers are started
+        from a fork server and load the models with worker_init.
+        """
+        if preload is not None:
+            preload()
+
+        # A child forked while other threads run can inherit locks (allocator, SQLite, logging)
+        # held by threads that don't exist in it
+        start_method = "fork" if threading.active_count() == 1 else "forkserver"
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(self.torch_threads, self.worker_init if start_method != "fork" else None)
+        )
+        # Start the workers now rather than on the first request
+        executor.submit(_worker_pid).result()
+
+        with self._lock:
+            self._executor = executor
+            self.start_method = start_method
+            self._started_at = time.time()
+            self._worker_stats = {}
+        print(f"Inference pool started with {self.workers} workers ({start_method}, "
+              f"{self.torch_threads} torch threads each).")
+
+    def restart(self, preload: Optional[Callable[[], Any]] = None):
+        """Starts a fresh set of workers (e.g. after a model swap); the old workers finish their in-flight tasks."""
+        old_executor = self._executor
+        self.start(preload)
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Runs fn(*args) in a worker process. fn must be a picklable module-level function."""
+        loop = asyncio.get_running_loop()
+        pid, busy_seconds, result = await loop.run_in_executor(self._executor, _timed_call, fn, args)
+        with self._lock:
+            worker = self._worker_stats.setdefault(pid, {'tasks': 0, 'busy_seconds': 0.0})
+            worker['tasks'] += 1
+            worker['busy_seconds'] += busy_seconds
+        return result
+
+    async def collect(self, fn: Callable[[], Any], linger: float = 0.05) -> Dict[int, Any]:
+        """
+        Runs fn() once per worker and returns {pid: result}. Tasks can't be addressed to
+        a worker, so each lingers briefly for the others to take the rest; a worker that
+        is busy for longer than that may be missed (the result then has fewer pids).
+        """
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(loop.run_in_executor(self._executor, _collect_call, fn, linger)
+                                         for _ in range(self.workers)))
+        return dict(results)
+
+    def stats(self) -> dict:
+        if not self.started:
+            return {'started': False, 'workers': self.workers}
+
+        uptime = max(time.time() - self._started_at, 1e-9)
+        with self._lock:
+            per_worker = {
+                str(pid): {
+                    'tasks': worker['tasks'],
+                    'busy_seconds': worker['busy_seconds'],
+                    'utilisation': min(1.0, worker['busy_seconds'] / uptime)
+                }
+                for pid, worker in self._worker_stats.items()
+            }
+        return {
+            'started': True,
+            'workers': self.workers,
+            'start_method': self.start_method,
+            'torch_threads': self.torch_threads,
+            'uptime_seconds': uptime,
+            'per_worker': per_worker
+        }
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""inference_scheduler.py
+
+Cross-request micro-batching for model inference.
+
+Concurrent requests submit single items; the scheduler collects them until it
+has `max_batch_size` items or the oldest one has waited `max_wait_ms`, runs the
+whole batch through `batch_fn` off the event loop, and resolves each caller's
+future with its own result.
+"""
+
+import asyncio
+import collections
+import time
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, List, Optional
+
+from metrics import Counter, Histogram
+
+
+class SchedulerQueueFull(Exception):
+    """Raised by submit() when the scheduler already holds max_queue_size pending items."""
+
+
+class MicroBatchScheduler:
+    """
+    Queues items from concurrent callers and flushes them to `batch_fn` as one batch.
+
+    Args:
+        batch_fn (callable): Takes a list of items and returns a list of results in the same order.
+        max_batch_size (int): Flush as soon as this many items are pending.
+        max_wait_ms (float): Flush once the oldest pending item has waited this long.
+        max_queue_size (int): Pending items allowed before submit() raises SchedulerQueueFull.
+        executor (Executor): Where batch_fn runs; None uses the event loop's default thread pool.
+        name (str): Prefix for exported metric names.
+        runner (callable): Optional coroutine function runner(batch_fn, items) used instead of
+            `executor`, e.g. InferencePool.run to score batches in worker processes.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 16,
+                 max_wait_ms: float = 5.0, max_queue_size: int = 1024,
+                 executor: Optional[Executor] = None, name: str = "inference",
+                 runner: Optional[Callable[[Callable, List[Any]], Awaitable[List[Any]]]] = None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_queue_size = max_queue_size
+        self.executor = executor
+        self.runner = runner
+        self.name = name
+
+        self.batch_size_histogram = Histogram(
+            f"{name}_batch_size", [1, 2, 4, 8, 16, 32, 64, 128, 256], unit="items")
+        self.queue_wait_histogram = Histogram(
+            f"{name}_queue_wait_ms", [0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000], unit="ms")
+        self.rejected = Counter(f"{name}_rejected")
+
+        self._queue = collections.deque()
+        self._pending = None
+        self._batch_full = None
+        self._task = None
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._pending = asyncio.Event()
+            self._batch_full = asyncio.Event()
+            if self._queue:
+                self._pending.set()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """Queues one item and waits for its result from the next flushed batch."""
+        self._ensure_started()
+        if len(self._queue) >= self.max_queue_size:
+            self.rejected.inc()
+            raise SchedulerQueueFull(f"{self.name} scheduler queue is full ({self.max_queue_size} pending items).")
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((item, future, time.perf_counter()))
+        self._pending.set()
+        if len(self._queue) >= self.max_batch_size:
+            self._batch_full.set()
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._pending.wait()
+
+            # Wait for a full batch, but never longer than the oldest item's deadline
+            if len(self._queue) < self.max_batch_size:
+                waited = time.perf_counter() - self._queue[0][2]
+                timeout = self.max_wait - waited
+                if timeout > 0:
+                    try:
+                        await asyncio.wait_for(self._batch_full.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+
+            batch = []
+            while self._queue and len(batch) < self.max_batch_size:
+                batch.append(self._queue.popleft())
+            if not self._queue:
+                self._pending.clear()
+            if len(self._queue) < self.max_batch_size:
+                self._batch_full.clear()
+
+            # Callers that gave up (e.g. client disconnected) don't need scoring
+            batch = [entry for entry in batch if not entry[1].cancelled()]
+            if not batch:
+                continue
+
+            flushed_at = time.perf_counter()
+            self.batch_size_histogram.observe(len(batch))
+            for _, _, enqueued_at in batch:
+                self.queue_wait_histogram.observe((flushed_at - enqueued_at) * 1000.0)
+
+            try:
+                items = [entry[0] for entry in batch]
+                if self.runner is not None:
+                    results = await self.runner(self.batch_fn, items)
+                else:
+                    results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            if len(results) != len(batch):
+                # zip would leave the unmatched callers waiting forever
+                error = RuntimeError(f"{self.name} batch function returned {len(results)} results for {len(batch)} items.")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'max_queue_size': self.max_queue_size,
+            'queue_depth': len(self._queue),
+            'rejected': self.rejected.value,
+            'batch_size': self.batch_size_histogram.snapshot(),
+            'queue_wait_ms': self.queue_wait_histogram.snapshot()
+        }
@@ -7,10 +7,15 @@ Original file is located at
     https://colab.research.google.com/drive/1cEfd5rfWYGsw5cdITmD5Pox5-Ip508gY
 """
 
+# Time every import below and the startup phases (see startup_profiler.py)
+from startup_profiler import startup_profiler
+startup_profiler.start_import_timing()
+
 import fastapi
 from fastapi import FastAPI, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 import os
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
@@ -18,6 +23,12 @@ import random
 import json
 import requests
 import urllib.parse
+import asyncio
+import collections
+import subprocess
+import sys
+import threading
+import time
 
 # Firebase Admin SDK imports
 import firebase_admin
@@ -28,22 +39,46 @@ from algoliasearch.search_client import SearchClient
 
 # --- Imports for Real IndicTrans2 ---
 import torch
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
 from IndicTransToolkit.processor import IndicProcessor
 import warnings
 
+from inference_scheduler import MicroBatchScheduler, SchedulerQueueFull
+from inference_pool import InferencePool
+from explanation_jobs import DEFAULT_ARTIFACT_DIR, ExplanationJobQueue
+from model_versions import DEFAULT_MODEL_ROOT, ModelWatcher
+from campaign_dedup import MinHashLSHIndex, seed_from_dataset
+from model_compile import warm_up
+from translation_engine import DECODING_PROFILES, DEFAULT_MODEL_NAME, LANG_MAP, choose_profile, load_translator, stream_translation, translate_batch
+from translation_cache import TranslationCache
+from pretranslation import PretranslationQueue
+from translation_memory import TranslationMemory
+from metrics import Histogram
+startup_profiler.mark("""imports""")
+
 # Suppress warnings for cleaner output
 warnings.filterwarnings("""ignore""")
 
 # Define device (GPU if available, else CPU)
 DEVICE = """cuda""" if torch.cuda.is_available() else """cpu"""
 
-# Global variables for IndicTrans2 model, tokenizer, and processor
+# Global variables for the IndicTrans2 translator (model + tokenizer) and processor
 # These will be initialized in the startup event to ensure Firebase is ready first
-indictrans2_model = None
-indictrans2_tokenizer = None
+indictrans2_translator = None
 indictrans2_processor = None
 
+# Translation engine: "pytorch", "pytorch-int8" or "ctranslate2" (needs INDICTRANS2_CT2_DIR; see translation_engine.py)
+INDICTRANS2_ENGINE = os.getenv("""INDICTRANS2_ENGINE""", """pytorch""")
+INDICTRANS2_CT2_DIR = os.getenv("""INDICTRANS2_CT2_DIR""", """./indictrans2-ct2-int8""")
+
+# Opt-in compilation of the IndicTrans2 forward before warm-up (see model_compile.py)
+INDICTRANS2_COMPILE = os.getenv("""INDICTRANS2_COMPILE""", """none""")
+
+# Readiness for load balancers: /ready answers 503 until startup_event has loaded and warmed the models
+startup_state = {"""ready""": False, """phase""": """starting""", """warmup""": {}}
+
+# Where startup_event also writes the startup profile as JSON (it is always logged and served at /startup-profile)
+STARTUP_PROFILE_PATH = os.getenv("""STARTUP_PROFILE_PATH""") or None
+
 app = FastAPI(title="""HAVEN Backend Service (Cloud Ready with Algolia & Payments)""")
 
 # CORS configuration (adjust origins for your frontend deployment)
@@ -79,6 +114,7 @@ try:
 except Exception as e:
     print(f"""Error initializing Firebase Admin SDK: {e}""")
     print("""Ensure FIREBASE_SERVICE_ACCOUNT_KEY_JSON_BASE64 environment variable is set correctly, or GOOGLE_APPLICATION_CREDENTIALS points to a valid key file.""")
+startup_profiler.mark("""firebase-init""")
 
 
 # --- API Configurations (Loaded from Environment Variables) ---
@@ -107,6 +143,170 @@ except Exception as e:
     print(f"""Error initializing Algolia client: {e}""")
     algolia_client = None
     algolia_index = None
+startup_profiler.mark("""algolia-init""")
+
+
+# --- Process-Pool Inference Tier ---
+# With INFERENCE_WORKERS > 0, model calls run in worker processes forked after the models are
+# loaded in startup_event (weights shared copy-on-write); otherwise they run in a thread pool.
+# Workers restarted after a model swap come from a fork server and load only the fraud model
+# themselves; translation then runs in the main process's thread pool instead (see run_translation_inference).
+INFERENCE_WORKERS = int(os.getenv("""INFERENCE_WORKERS""", """0"""))
+INFERENCE_TORCH_THREADS = int(os.getenv("""INFERENCE_TORCH_THREADS""", """1"""))
+
+def _load_inference_models():
+    """Loads the fraud model in an inference worker that didn't inherit it."""
+    from fraud_detection import fraud_model # Local import
+    # Not IndicTrans2: it doesn't change on a swap, and a copy per worker would multiply its memory
+    fraud_model.load()
+
+inference_pool = InferencePool(workers=INFERENCE_WORKERS, torch_threads=INFERENCE_TORCH_THREADS,
+                               worker_init=_load_inference_models)
+
+async def run_inference(fn, *args):
+    """Awaits fn(*args) in the inference pool (or a thread if the pool is off) without blocking the event loop."""
+    if inference_pool.started:
+        return await inference_pool.run(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+async def run_translation_inference(fn, *args):
+    """Like run_inference, but only uses pool workers forked with the IndicTrans2 model already loaded."""
+    if inference_pool.started and inference_pool.start_method == """fork""":
+        return await inference_pool.run(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+def _prediction_cache_stats() -> Dict[str, Any]:
+    from fraud_detection import prediction_cache # Local import
+    return prediction_cache.stats()
+
+async def fraud_prediction_cache_stats() -> Dict[str, Any]:
+    """Prediction cache stats of wherever fraud scoring runs: the workers' caches summed when the pool is on."""
+    from fraud_detection import prediction_cache # Local import
+    if not inference_pool.started:
+        return prediction_cache.stats()
+
+    per_worker = await inference_pool.collect(_prediction_cache_stats)
+    stats = {name: sum(worker[name] for worker in per_worker.values())
+             for name in ("""memory_entries""", """hits""", """disk_hits""", """misses""", """evictions""")}
+    lookups = stats["""hits"""] + stats["""misses"""]
+    # The on-disk tier is one file shared by all processes
+    disk_entries = [worker["""disk_entries"""] for worker in per_worker.values() if worker["""disk_entries"""] is not None]
+    stats.update({
+        """hit_rate""": (stats["""hits"""] / lookups) if lookups else 0.0,
+        """disk_entries""": max(disk_entries) if disk_entries else None,
+        """workers_reported""": len(per_worker),
+        """per_worker""": {str(pid): worker for pid, worker in per_worker.items()},
+        """main_process""": prediction_cache.stats()
+    })
+    return stats
+
+
+# --- Fraud Scoring Micro-Batching ---
+# Concurrent /fraud-check and campaign creation requests are queued and scored together
+# as one model batch, flushed at FRAUD_BATCH_MAX_SIZE items or after FRAUD_BATCH_MAX_WAIT_MS.
+FRAUD_BATCH_MAX_SIZE = int(os.getenv("""FRAUD_BATCH_MAX_SIZE""", """16"""))
+FRAUD_BATCH_MAX_WAIT_MS = float(os.getenv("""FRAUD_BATCH_MAX_WAIT_MS""", """5"""))
+FRAUD_BATCH_MAX_QUEUE = int(os.getenv("""FRAUD_BATCH_MAX_QUEUE""", """1024"""))
+
+def _predict_fraud_batch(organizations: List[Dict[str, Any]]) -> List[tuple]:
+    from fraud_detection import predict_fraud_batch # Local import
+    return predict_fraud_batch(organizations)
+
+fraud_scheduler = MicroBatchScheduler(
+    _predict_fraud_batch,
+    max_batch_size=FRAUD_BATCH_MAX_SIZE,
+    max_wait_ms=FRAUD_BATCH_MAX_WAIT_MS,
+    max_queue_size=FRAUD_BATCH_MAX_QUEUE,
+    name="""fraud""",
+    runner=run_inference
+)
+
+async def score_fraud(organization_data: Dict[str, Any]) -> tuple:
+    """Scores one organization through the shared micro-batching scheduler without blocking the event loop."""
+    try:
+        return await fraud_scheduler.submit(organization_data)
+    except SchedulerQueueFull as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+
+# --- Campaign Near-Duplicate Pre-Filter ---
+# Campaign descriptions that are textual near-duplicates (MinHash Jaccard >= CAMPAIGN_DEDUP_THRESHOLD)
+# of a rejected or known-fraud campaign are rejected before any model runs; see campaign_dedup.py.
+CAMPAIGN_DEDUP_INDEX_PATH = os.getenv("""CAMPAIGN_DEDUP_INDEX_PATH""", """./campaign-minhash.idx""")
+CAMPAIGN_DEDUP_THRESHOLD = float(os.getenv("""CAMPAIGN_DEDUP_THRESHOLD""", """0.8"""))
+
+campaign_dedup_index = MinHashLSHIndex(CAMPAIGN_DEDUP_INDEX_PATH or None, threshold=CAMPAIGN_DEDUP_THRESHOLD)
+
+def near_duplicate_rejection(description: str) -> Optional[Dict[str, Any]]:
+    """Rejection response for a description matching an indexed fraudulent campaign, or None."""
+    match = campaign_dedup_index.query(description)
+    if match is None:
+        return None
+    return {
+        """campaign_id""": None,
+        """message""": f"""Campaign rejected: near-duplicate of fraudulent campaign {match['campaign_id']}.""",
+        """matched_campaign_id""": match["""campaign_id"""],
+        """similarity""": match["""similarity"""]
+    }
+
+
+# --- Background SHAP Explanations ---
+# /fraud-check returns immediately with an explanation job id; SHAP_WORKERS threads compute
+# token attributions and plots, cached on disk by input hash and model version under SHAP_ARTIFACT_DIR.
+SHAP_WORKERS = int(os.getenv("""SHAP_WORKERS""", """1"""))
+
+def _explain_fraud_text(text: str, plot_path: str, loader) -> Dict[str, Any]:
+    from fraud_detection import explain_fraud_text # Local import
+    return explain_fraud_text(text, plot_path, loader=loader)
+
+explanation_queue = ExplanationJobQueue(
+    _explain_fraud_text,
+    artifact_dir=os.getenv("""SHAP_ARTIFACT_DIR""", DEFAULT_ARTIFACT_DIR),
+    max_workers=SHAP_WORKERS
+)
+
+
+# --- Fraud Model Hot Swap ---
+# Training runs in a background process (train_fraud_model.py) that publishes each new model as
+# a version under FRAUD_MODEL_ROOT; the watcher loads, warms and swaps it in without a restart.
+FRAUD_MODEL_ROOT = os.getenv("""FRAUD_MODEL_ROOT""", DEFAULT_MODEL_ROOT)
+FRAUD_TRAIN_ON_STARTUP = os.getenv("""FRAUD_TRAIN_ON_STARTUP""", """1""") == """1"""
+FRAUD_MODEL_POLL_SECONDS = float(os.getenv("""FRAUD_MODEL_POLL_SECONDS""", """10"""))
+
+training_process: Optional[subprocess.Popen] = None
+
+def _swap_fraud_model(version_dir: str):
+    from fraud_detection import swap_fraud_model # Local import
+    swap_fraud_model(version_dir)
+    # Workers started before the swap still hold the old weights; start fresh ones that load the new model
+    if inference_pool.started:
+        inference_pool.restart()
+
+model_watcher = ModelWatcher(_swap_fraud_model, model_root=FRAUD_MODEL_ROOT, interval=FRAUD_MODEL_POLL_SECONDS)
+
+def training_in_progress() -> bool:
+    return training_process is not None and training_process.poll() is None
+
+def _start_training_process(script_name: str, *args: str) -> subprocess.Popen:
+    """Runs a training script as a separate process; the version it publishes is picked up by model_watcher."""
+    global training_process
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), script_name)
+    # The ONNX backends only serve a version with its own exported graphs
+    if os.getenv("""FRAUD_INFERENCE_BACKEND""", """pytorch""") in ("""onnx""", """onnx-int8"""):
+        args = (*args, """--export-onnx""")
+    training_process = subprocess.Popen([sys.executable, script, *args, """--model-root""", FRAUD_MODEL_ROOT])
+    print(f"""Started background fraud model training: {script_name} (pid {training_process.pid}).""")
+    return training_process
+
+def start_background_training(dataset_path: str = """ngo_fraud.csv""", k_folds: int = 1) -> subprocess.Popen:
+    if training_in_progress():
+        return training_process
+    return _start_training_process("""train_fraud_model.py""", """--dataset""", dataset_path, """--k-folds""", str(k_folds))
+
+# Manual-review outcomes are fed back by incremental_update.py, fine-tuning the published version
+# on new reviews plus FRAUD_REPLAY_RATIO times as many examples replayed from the original dataset.
+FRAUD_INCREMENTAL_MIN_REVIEWS = int(os.getenv("""FRAUD_INCREMENTAL_MIN_REVIEWS""", """1"""))
+FRAUD_REPLAY_RATIO = float(os.getenv("""FRAUD_REPLAY_RATIO""", """2.0"""))
 
 
 # Pydantic Models
@@ -172,6 +372,10 @@ class Campaign(BaseModel):
     verification_details: Optional[Dict[str, Any]] = None
     image_url: Optional[str] = None
 
+class ReviewDecisionRequest(BaseModel):
+    decision: str # 'legitimate' or 'fraud'
+    notes: Optional[str] = None
+
 class InitiatePaymentRequest(BaseModel):
     campaign_id: str
     amount: int
@@ -233,78 +437,106 @@ async def verify_firebase_id_token(user_login: UserLogin):
         )
 
 # --- Real IndicTrans2 Translation Function ---
-def indictrans2_translate(text: str, source_lang: str, target_lang: str) -> str:
-    global indictrans2_model, indictrans2_tokenizer, indictrans2_processor
+# Texts per generate() call when translating in batches (see translation_engine.py)
+INDICTRANS2_BATCH_SIZE = int(os.getenv("""INDICTRANS2_BATCH_SIZE""", """16"""))
 
-    if not indictrans2_model or not indictrans2_tokenizer or not indictrans2_processor:
-        print("""IndicTrans2 model not initialized. Translation will not work.""")
-        return f"""{text} (Translation Service Unavailable)"""
+# Decoding profiles ("quality" = 5 beams, "balanced" = 2, "fast" = greedy). Requests may pick one;
+# otherwise the default is used until more than TRANSLATION_BALANCED_ABOVE / TRANSLATION_FAST_ABOVE
+# texts are being translated for requests at once
+TRANSLATION_DEFAULT_PROFILE = os.getenv("""TRANSLATION_DEFAULT_PROFILE""", """quality""")
+TRANSLATION_BALANCED_ABOVE = int(os.getenv("""TRANSLATION_BALANCED_ABOVE""", """16"""))
+TRANSLATION_FAST_ABOVE = int(os.getenv("""TRANSLATION_FAST_ABOVE""", """64"""))
 
-    try:
-        # Mapping your app's language codes to IndicTrans2's codes
-        # This map needs to be comprehensive for all languages you support
-        lang_map = {
-            """en""": """eng_Latn""",
-            """hi""": """hin_Deva""",
-            """bn""": """ben_Beng""",
-            """ta""": """tam_Taml""",
-            """te""": """tel_Telu""",
-            """mr""": """mar_Deva""",
-            """gu""": """guj_Gujr""",
-            """pa""": """pan_Guru""",
-            """kn""": """kan_Knda""",
-            """ml""": """mal_Mlym""",
-            """or""": """ori_Orya""",
-            """as""": """asm_Beng""",
-            """ur""": """urd_Arab""",
-            """ne""": """nep_Deva""",
-            """si""": """sin_Sinh""",
-            """my""": """mya_Mymr""", # Myanmar (Burmese) - example, check if supported
-            # Add more as needed
-        }
+translation_in_flight = 0
 
-        src_lang_code = lang_map.get(source_lang, None)
-        tgt_lang_code = lang_map.get(target_lang, None)
-
-        if not src_lang_code or not tgt_lang_code:
-            return f"""{text} (Unsupported language code for IndicTrans2: {source_lang} or {target_lang})"""
-
-        # Preprocess the input text using IndicProcessor
-        batch = indictrans2_processor.preprocess_batch([text], src_lang=src_lang_code, tgt_lang=tgt_lang_code)
-
-        # Tokenize and generate translations
-        inputs = indictrans2_tokenizer(
-            batch,
-            truncation=True,
-            padding="""longest""",
-            return_tensors="""pt""",
-            return_attention_mask=True,
-        ).to(DEVICE)
-
-        with torch.no_grad():
-            generated_tokens = indictrans2_model.generate(
-                **inputs,
-                use_cache=True,
-                min_length=0,
-                max_length=256, # Adjust max_length as needed based on typical text length
-                num_beams=5, # Number of beams for beam search
-                num_return_sequences=1,
-            )
+def indictrans2_translate_batch(items: List[tuple], profile: str = """quality""") -> List[str]:
+    """Translates (text, source_lang, target_lang) items with deduplicated, length-bucketed generate() batches."""
+    global indictrans2_translator, indictrans2_processor
 
-        # Decode the generated tokens
-        translated_text = indictrans2_tokenizer.batch_decode(generated_tokens.detach().cpu().tolist(), skip_special_tokens=True)[0]
+    if not indictrans2_translator or not indictrans2_processor:
+        print("""IndicTrans2 model not initialized. Translation will not work.""")
+        return [f"""{text} (Translation Service Unavailable)""" for text, _, _ in items]
+
+    return translate_batch(items, indictrans2_translator, indictrans2_processor, profile=profile,
+                           max_length=256, max_batch_size=INDICTRANS2_BATCH_SIZE)
+
+def indictrans2_translate(text: str, source_lang: str, target_lang: str, profile: str = """quality""") -> str:
+    return indictrans2_translate_batch([(text, source_lang, target_lang)], profile)[0]
+
+# --- Translation Memory ---
+# Texts are split into sentences; sentences translated before (exactly, or a near match differing only
+# in case, punctuation or articles) are served from memory and only the rest reach the model (see translation_memory.py)
+TRANSLATION_MEMORY_ENABLED = os.getenv("""TRANSLATION_MEMORY_ENABLED""", """1""") == """1"""
+TRANSLATION_MEMORY_PATH = os.getenv("""TRANSLATION_MEMORY_PATH""", """./translation-memory.sqlite""")
+TRANSLATION_MEMORY_FUZZY_THRESHOLD = float(os.getenv("""TRANSLATION_MEMORY_FUZZY_THRESHOLD""", """0.9"""))
+
+translation_memory = TranslationMemory(TRANSLATION_MEMORY_PATH or None, fuzzy_threshold=TRANSLATION_MEMORY_FUZZY_THRESHOLD)
+
+async def run_translation(translate_fn, items: List[tuple], *args) -> List[str]:
+    """Awaits translate_fn(items, *args) in the inference tier for only the sentences the translation memory can't serve."""
+    if not TRANSLATION_MEMORY_ENABLED:
+        return await run_translation_inference(translate_fn, items, *args)
+    plan = translation_memory.plan(items)
+    translations = await run_translation_inference(translate_fn, plan.misses, *args) if plan.misses else []
+    return plan.complete(translations)
+
+async def translate_for_request(items: List[tuple], requested_profile: Optional[str] = None) -> List[str]:
+    """Translates items in the inference tier with the requested profile, or one chosen by the current load."""
+    global translation_in_flight
+    if requested_profile is not None and requested_profile not in DECODING_PROFILES:
+        raise HTTPException(status_code=400, detail=f"""Unknown translation profile '{requested_profile}'; expected one of {list(DECODING_PROFILES)}.""")
+
+    profile = choose_profile(requested_profile, translation_in_flight, TRANSLATION_DEFAULT_PROFILE,
+                             TRANSLATION_BALANCED_ABOVE, TRANSLATION_FAST_ABOVE)
+    translation_in_flight += len(items)
+    try:
+        return await run_translation(indictrans2_translate_batch, items, profile)
+    finally:
+        translation_in_flight -= len(items)
+
+# In-process LRU over the `translations` collection, one deterministic document per
+# campaign/field/language (see translation_cache.py)
+TRANSLATION_CACHE_SIZE = int(os.getenv("""TRANSLATION_CACHE_SIZE""", """20000"""))
+
+translation_cache = TranslationCache(db, max_entries=TRANSLATION_CACHE_SIZE)
+
+# --- Background Pre-Translation ---
+# New campaigns' names and descriptions are translated into every supported language in the
+# background, most-requested languages first (see pretranslation.py)
+PRETRANSLATE_ENABLED = os.getenv("""PRETRANSLATE_ENABLED""", """1""") == """1"""
+PRETRANSLATE_WORKERS = int(os.getenv("""PRETRANSLATE_WORKERS""", """1"""))
+PRETRANSLATE_BATCH_SIZE = int(os.getenv("""PRETRANSLATE_BATCH_SIZE""", """32"""))
+
+pretranslation_queue = PretranslationQueue(
+    indictrans2_translate_batch,
+    translation_cache,
+    [language for language in LANG_MAP if language != """en"""],
+    workers=PRETRANSLATE_WORKERS,
+    batch_size=PRETRANSLATE_BATCH_SIZE,
+    runner=run_translation
+)
 
-        return translated_text
+def queue_pretranslation(campaign_id: str, campaign_data: Dict[str, Any]):
+    if PRETRANSLATE_ENABLED:
+        pretranslation_queue.enqueue(campaign_id, {field: campaign_data.get(field) for field in ("""name""", """description""")})
 
-    except Exception as e:
-        print(f"""Error during real IndicTrans2 translation: {e}""")
-        return f"""{text} (Translation Failed: {e})"""
+def warmup_indictrans2() -> dict:
+    """Translates a short and a campaign-length text with every decoding profile, twice each, logging cold vs warm latency."""
+    samples = {
+        """short""": """Help us plant trees.""",
+        """long""": """Help us build AI-powered drones that plant trees and monitor forest health. """
+                    """Every contribution funds saplings, drone maintenance and training for local volunteers."""
+    }
+    return warm_up(f"""IndicTrans2 ({indictrans2_translator.engine}, compile={INDICTRANS2_COMPILE})""",
+                   lambda length, profile: indictrans2_translate(samples[length], """en""", """hi""", profile),
+                   [(length, profile) for length in samples for profile in DECODING_PROFILES])
 
 
 class TranslationRequest(BaseModel):
     campaign_id: str
     field: str  # e.g., 'name', 'description'
     target_language: str  # e.g., 'hi' (Hindi), 'ta' (Tamil)
+    profile: Optional[str] = None  # 'quality', 'balanced' or 'fast'; chosen by load if omitted
 
 @app.post("""/translate""")
 async def translate_text_endpoint(
@@ -312,7 +544,7 @@ async def translate_text_endpoint(
     current_user: UserInfo = Depends(get_current_user)
 ):
     if not db: raise HTTPException(status_code=500, detail="""Firestore not initialized.""")
-    if not indictrans2_model: raise HTTPException(status_code=500, detail="""Translation model not initialized.""")
+    if not indictrans2_translator: raise HTTPException(status_code=500, detail="""Translation model not initialized.""")
 
     campaign_ref = db.collection("""campaigns""").document(request.campaign_id)
     campaign_doc = campaign_ref.get()
@@ -322,45 +554,132 @@ async def translate_text_endpoint(
 
     campaign_data = campaign_doc.to_dict()
 
-    translations_ref = db.collection("""translations""")
-    query = translations_ref.where("""campaign_id""", """==""", request.campaign_id)\
-                            .where("""field""", """==""", request.field)\
-                            .where("""language""", """==""", request.target_language)
-
-    cached_translation_docs = query.limit(1).get()
-
-    if cached_translation_docs:
-        for doc in cached_translation_docs:
-            return {"""translated_text""": doc.to_dict().get("""translated_text""")}
-
     original_text = campaign_data.get(request.field)
     if not original_text:
         raise HTTPException(status_code=400, detail="""Invalid field or field not found in campaign.""")
 
+    pretranslation_queue.record_request(request.target_language)
+    cached_translation = translation_cache.get(request.campaign_id, request.field, request.target_language, original_text)
+    if cached_translation is not None:
+        return {"""translated_text""": cached_translation}
+
     # Use the real IndicTrans2 translation function
-    translated_text = indictrans2_translate(
-        text=original_text,
-        source_lang="""en""", # Assuming source is always English for campaign content
-        target_lang=request.target_language
-    )
+    translated_text = (await translate_for_request(
+        [(original_text, """en""", request.target_language)], # Assuming source is always English for campaign content
+        request.profile
+    ))[0]
 
-    translations_ref.add({
-        """campaign_id""": request.campaign_id,
-        """field""": request.field,
-        """language""": request.target_language,
-        """translated_text""": translated_text,
-        """timestamp""": firestore.SERVER_TIMESTAMP
-    })
+    translation_cache.put(request.campaign_id, request.field, request.target_language, original_text, translated_text)
 
     return {"""translated_text""": translated_text}
 
+# --- Streaming Translation ---
+# /translate/stream sends the translation as server-sent events while it is decoded. Beam search
+# only settles on a hypothesis at the end, so streams always decode greedily (the "fast" profile)
+translation_ttft_ms = Histogram("""translation_ttft_ms""", [50, 100, 200, 500, 1000, 2000, 5000], unit="""ms""")
+translation_stream_ms = Histogram("""translation_stream_ms""", [250, 500, 1000, 2000, 5000, 10000, 30000], unit="""ms""")
+
+# A stream keeps its IndicProcessor's placeholder state for the whole generation, so each stream
+# takes a processor of its own (reused by later streams) rather than locking the shared one
+stream_processors = collections.deque()
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"""event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"""
+
+@app.post("""/translate/stream""")
+async def translate_text_stream_endpoint(
+    request: TranslationRequest,
+    http_request: Request,
+    current_user: UserInfo = Depends(get_current_user)
+):
+    """
+    Same request as /translate. Emits `delta` events ({"text": ...}) as tokens are decoded and a
+    final `done` event ({"translated_text": ..., "cached": ...}) once the translation has been
+    written to the translations cache; the delta text is not postprocessed, the final text is.
+    """
+    if not db: raise HTTPException(status_code=500, detail="""Firestore not initialized.""")
+    if not indictrans2_translator: raise HTTPException(status_code=500, detail="""Translation model not initialized.""")
+
+    campaign_doc = db.collection("""campaigns""").document(request.campaign_id).get()
+    if not campaign_doc.exists:
+        raise HTTPException(status_code=404, detail="""Campaign not found""")
+
+    original_text = campaign_doc.to_dict().get(request.field)
+    if not original_text:
+        raise HTTPException(status_code=400, detail="""Invalid field or field not found in campaign.""")
+
+    pretranslation_queue.record_request(request.target_language)
+    cached_translation = translation_cache.get(request.campaign_id, request.field, request.target_language, original_text)
+
+    async def events():
+        global translation_in_flight
+        if cached_translation is not None:
+            yield sse_event("""done""", {"""translated_text""": cached_translation, """cached""": True})
+            return
+
+        # The generator runs in a thread of this process (the model is loaded here too, and the
+        # pool can't stream); its events are handed to the event loop through a queue
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                processor = stream_processors.pop()
+            except IndexError:
+                processor = IndicProcessor(build_map_filename=True)
+            try:
+                for event in stream_translation(original_text, """en""", request.target_language, indictrans2_translator,
+                                                processor, max_length=256, stop=stop):
+                    loop.call_soon_threadsafe(queue.put_nowait, event)
+                # Only reused once postprocess_batch has consumed its placeholders
+                stream_processors.append(processor)
+            except Exception as e:
+                print(f"""Error streaming translation of {request.campaign_id}/{request.field}: {e}""")
+                loop.call_soon_threadsafe(queue.put_nowait, ("""error""", str(e)))
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        started = time.perf_counter()
+        first_token = True
+        translation_in_flight += 1
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                kind, text = item
+                if kind == """delta""":
+                    if first_token:
+                        translation_ttft_ms.observe((time.perf_counter() - started) * 1000.0)
+                        first_token = False
+                    yield sse_event("""delta""", {"""text""": text})
+                elif kind == """final""":
+                    await loop.run_in_executor(None, translation_cache.put, request.campaign_id, request.field,
+                                               request.target_language, original_text, text)
+                    translation_stream_ms.observe((time.perf_counter() - started) * 1000.0)
+                    yield sse_event("""done""", {"""translated_text""": text, """cached""": False})
+                else:
+                    yield sse_event("""error""", {"""detail""": """Translation failed."""})
+                if await http_request.is_disconnected():
+                    break # The partial translation is never cached
+        finally:
+            # Client gone or stream finished: stop decoding and release the processor lock
+            stop.set()
+            translation_in_flight -= 1
+            await producer
+
+    return StreamingResponse(events(), media_type="""text/event-stream""",
+                             headers={"""Cache-Control""": """no-cache""", """X-Accel-Buffering""": """no"""})
+
 @app.get("""/campaigns""", response_model=List[Campaign])
 async def get_campaigns(
     language: Optional[str] = """en""",
+    profile: Optional[str] = None,
     current_user: UserInfo = Depends(get_current_user)
 ):
     if not db: raise HTTPException(status_code=500, detail="""Firestore not initialized.""")
-    if language != """en""" and not indictrans2_model: raise HTTPException(status_code=500, detail="""Translation model not initialized for non-English content.""")
+    if language != """en""" and not indictrans2_translator: raise HTTPException(status_code=500, detail="""Translation model not initialized for non-English content.""")
 
     campaigns_ref = db.collection("""campaigns""")
     campaign_docs = campaigns_ref.stream()
@@ -377,40 +696,46 @@ async def get_campaigns(
         if """image_url""" not in campaign_data or not campaign_data["""image_url"""]:
             campaign_data["""image_url"""] = f"""https://placehold.co/600x400/E0E0E0/333333?text={campaign_data['name'].replace(' ', '+')}"""
 
+        result.append(campaign_data)
 
-        if language != """en""":
-            for field in ["""name""", """description"""]:
-                translations_query = db.collection("""translations""")\
-                                       .where("""campaign_id""", """==""", doc.id)\
-                                       .where("""field""", """==""", field)\
-                                       .where("""language""", """==""", language)
+    if language != """en""":
+        pretranslation_queue.record_request(language)
+        # All cached translations in one bulk read; everything missing is translated in one batched call
+        wanted = [(campaign_data, field) for campaign_data in result for field in ["""name""", """description"""]
+                  if campaign_data.get(field)]
+        cached_translations = translation_cache.get_many(
+            [(campaign_data["""id"""], field, language, campaign_data[field]) for campaign_data, field in wanted]
+        )
 
-                cached_translation_docs = translations_query.limit(1).get()
+        missing = []
+        for (campaign_data, field), cached_translation in zip(wanted, cached_translations):
+            if cached_translation is None:
+                missing.append((campaign_data, field))
+            else:
+                campaign_data[field] = cached_translation
 
-                if cached_translation_docs:
-                    for t_doc in cached_translation_docs:
-                        campaign_data[field] = t_doc.to_dict().get("""translated_text""")
-                else:
-                    original_text = campaign_data.get(field)
-                    if original_text:
-                        # Use the real IndicTrans2 translation function
-                        translated_text = indictrans2_translate(
-                            text=original_text,
-                            source_lang="""en""", # Assuming source is always English for campaign content
-                            target_lang=language
-                        )
-                        db.collection("""translations""").add({
-                            """campaign_id""": doc.id,
-                            """field""": field,
-                            """language""": language,
-                            """translated_text""": translated_text,
-                            """timestamp""": firestore.SERVER_TIMESTAMP
-                        })
-                        campaign_data[field] = translated_text
-        result.append(campaign_data)
+        if missing:
+            translated_texts = await translate_for_request(
+                # Assuming source is always English for campaign content
+                [(campaign_data[field], """en""", language) for campaign_data, field in missing],
+                profile
+            )
+            translation_cache.put_many([
+                (campaign_data["""id"""], field, language, campaign_data[field], translated_text)
+                for (campaign_data, field), translated_text in zip(missing, translated_texts)
+            ])
+            for (campaign_data, field), translated_text in zip(missing, translated_texts):
+                campaign_data[field] = translated_text
 
     return result
 
+@app.get("""/campaigns/{campaign_id}/translation-progress""")
+async def get_translation_progress(campaign_id: str, current_user: UserInfo = Depends(get_current_user)):
+    progress = pretranslation_queue.progress(campaign_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="""No pre-translation queued for this campaign.""")
+    return progress
+
 @app.get("""/campaign-stats""")
 async def get_campaign_stats(
     current_user: UserInfo = Depends(get_current_user)
@@ -524,10 +849,12 @@ async def check_fraud(
     current_user: UserInfo = Depends(get_current_user)
 ):
     org_data = request.dict()
-    from fraud_detection_verified import predict_fraud # Local import
-    fraud_score, explanation, plot_path, verification_details = predict_fraud(
-        organization_data=org_data
-    )
+    fraud_score, explanation, plot_path, verification_details = await score_fraud(org_data)
+
+    from fraud_detection import fraud_model, organization_text # Local import
+    text = organization_text(org_data)
+    # Versioned, so a hot-swapped model never serves the previous model's attributions
+    explanation_job_id = explanation_queue.submit(text, fraud_model)
 
     # Determine verification status based on new grading
     verification_status = ""
@@ -547,6 +874,9 @@ async def check_fraud(
             """explanation""": explanation,
             """verification_details""": verification_details,
             """verification_status""": verification_status, # Save the new status
+            """explanation_job_id""": explanation_job_id,
+            """text""": text, # Scored text, kept so reviewer decisions can be used for incremental training
+            """account_features""": {name: org_data.get(name) for name in ("""follower_count""", """post_count""", """account_age_days""", """engagement_rate""")},
             """timestamp""": firestore.SERVER_TIMESTAMP,
             """checked_by_uid""": current_user.uid
         })
@@ -555,10 +885,33 @@ async def check_fraud(
         """fraud_score""": fraud_score,
         """explanation""": explanation,
         """shap_plot""": plot_path,
+        """explanation_job_id""": explanation_job_id, # Poll /fraud-explanations/{id} for SHAP attributions
         """verification""": verification_details,
         """verification_status""": verification_status # Return the new status
     }
 
+@app.get("""/fraud-explanations/{job_id}""")
+async def get_fraud_explanation(
+    job_id: str,
+    current_user: UserInfo = Depends(get_current_user)
+):
+    job = explanation_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="""Explanation job not found.""")
+    if job.get("""plot_path"""):
+        job["""plot_url"""] = f"""/fraud-explanations/{job_id}/plot"""
+    return job
+
+@app.get("""/fraud-explanations/{job_id}/plot""")
+async def get_fraud_explanation_plot(
+    job_id: str,
+    current_user: UserInfo = Depends(get_current_user)
+):
+    job = explanation_queue.get(job_id)
+    if job is None or job["""status"""] != """done""" or not job.get("""plot_path"""):
+        raise HTTPException(status_code=404, detail="""Explanation plot not available yet.""")
+    return FileResponse(job["""plot_path"""], media_type="""image/png""")
+
 @app.post("""/create-campaign""", response_model=dict, dependencies=[Depends(get_admin_user)])
 async def create_campaign(
     request: CampaignCreateRequest,
@@ -567,6 +920,10 @@ async def create_campaign(
     if not db: raise HTTPException(status_code=500, detail="""Firestore not initialized.""")
 
     try:
+        rejection = near_duplicate_rejection(request.description)
+        if rejection is not None:
+            return rejection
+
         campaign_data = request.dict()
         campaign_data["""funded"""] = 0
         campaign_data["""days_left"""] = 30
@@ -589,10 +946,7 @@ async def create_campaign(
             """fcra_number""": campaign_data.get("""fcra_number""")
         }
 
-        from fraud_detection_verified import predict_fraud # Local import
-        fraud_score, explanation, plot_path, verification_details = predict_fraud(
-            organization_data=org_data_for_fraud_check
-        )
+        fraud_score, explanation, plot_path, verification_details = await score_fraud(org_data_for_fraud_check)
 
         campaign_data["""fraud_score"""] = fraud_score
         campaign_data["""fraud_explanation"""] = explanation
@@ -605,12 +959,15 @@ async def create_campaign(
             campaign_data["""verification_status"""] = """Needs Manual Review"""
         else: # fraud_score > 0.50
             campaign_data["""verification_status"""] = """Rejected"""
-            # If rejected, do not save to Firestore or Algolia
-            return {"""campaign_id""": None, """message""": """Campaign rejected due to high fraud risk."""}
+            # If rejected, do not save to campaigns or Algolia; keep it so copies are caught by the pre-filter
+            rejected_ref = db.collection("""rejected_campaigns""").add(campaign_data)
+            campaign_dedup_index.add(rejected_ref[1].id, campaign_data["""description"""])
+            return {"""campaign_id""": None, """message""": """Campaign rejected due to high fraud risk.""", """rejected_campaign_id""": rejected_ref[1].id}
 
 
         doc_ref = db.collection("""campaigns""").add(campaign_data)
         campaign_id = doc_ref[1].id
+        queue_pretranslation(campaign_id, campaign_data)
 
         if algolia_index:
             try:
@@ -621,6 +978,8 @@ async def create_campaign(
                 print(f"""Error indexing campaign {campaign_id} in Algolia: {e}""")
 
         return {"""campaign_id""": campaign_id, """message""": """Campaign created successfully with initial verification status."""}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"""Error creating campaign: {e}""")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"""Failed to create campaign: {e}""")
@@ -638,9 +997,41 @@ async def bulk_upload_campaigns(request: CampaignBulkUploadRequest, current_user
     errors = []
     batch = db.batch()
     algolia_objects_to_save = []
+    uploaded_campaigns = []
+
+    def build_org_data_for_fraud_check(campaign_data_req: CampaignCreateRequest) -> Dict[str, Any]:
+        return {
+            """org_name""": campaign_data_req.author,
+            """bio""": campaign_data_req.description,
+            """follower_count""": 0, """post_count""": 0, """account_age_days""": 0, """engagement_rate""": 0.0,
+            """recent_posts""": campaign_data_req.description,
+            """pan""": campaign_data_req.pan,
+            """reg_number""": campaign_data_req.registration_number,
+            """registration_type""": campaign_data_req.registration_type,
+            """ngo_darpan_id""": campaign_data_req.ngo_darpan_id,
+            """fcra_number""": campaign_data_req.fcra_number
+        }
 
-    for campaign_data_req in request.campaigns:
+    # Near-duplicates of known fraud are rejected without scoring
+    rejections = [near_duplicate_rejection(c.description) for c in request.campaigns]
+
+    # Submit every other campaign at once so the scheduler scores them in full batches
+    to_score = [c for c, rejection in zip(request.campaigns, rejections) if rejection is None]
+    scored = iter(await asyncio.gather(
+        *[score_fraud(build_org_data_for_fraud_check(c)) for c in to_score],
+        return_exceptions=True
+    ))
+    fraud_results = [rejection if rejection is not None else next(scored) for rejection in rejections]
+
+    for campaign_data_req, fraud_result, rejection in zip(request.campaigns, fraud_results, rejections):
         try:
+            if rejection is not None:
+                failed_count += 1
+                errors.append(f"""Campaign '{campaign_data_req.name}' rejected as a near-duplicate of fraudulent campaign {rejection['matched_campaign_id']} (similarity: {rejection['similarity']:.2f}).""")
+                continue
+            if isinstance(fraud_result, Exception):
+                raise fraud_result
+
             campaign_data = campaign_data_req.dict()
             campaign_data["""funded"""] = campaign_data.get("""funded""", 0)
             campaign_data["""days_left"""] = campaign_data.get("""days_left""", 30)
@@ -648,21 +1039,7 @@ async def bulk_upload_campaigns(request: CampaignBulkUploadRequest, current_user
             campaign_data["""created_at"""] = firestore.SERVER_TIMESTAMP
             campaign_data["""image_url"""] = f"""https://placehold.co/600x400/E0E0E0/333333?text={campaign_data['name'].replace(' ', '+')}"""
 
-            org_data_for_fraud_check = {
-                """org_name""": campaign_data.get("""author"""),
-                """bio""": campaign_data.get("""description"""),
-                """follower_count""": 0, """post_count""": 0, """account_age_days""": 0, """engagement_rate""": 0.0,
-                """recent_posts""": campaign_data.get("""description"""),
-                """pan""": campaign_data.get("""pan"""),
-                """reg_number""": campaign_data.get("""registration_number"""),
-                """registration_type""": campaign_data.get("""registration_type"""),
-                """ngo_darpan_id""": campaign_data.get("""ngo_darpan_id"""),
-                """fcra_number""": campaign_data.get("""fcra_number""")
-            }
-            from fraud_detection_verified import predict_fraud # Local import
-            fraud_score, explanation, plot_path, verification_details = predict_fraud(
-                organization_data=org_data_for_fraud_check
-            )
+            fraud_score, explanation, plot_path, verification_details = fraud_result
             campaign_data["""fraud_score"""] = fraud_score
             campaign_data["""fraud_explanation"""] = explanation
             campaign_data["""verification_details"""] = verification_details
@@ -674,16 +1051,20 @@ async def bulk_upload_campaigns(request: CampaignBulkUploadRequest, current_user
                 campaign_data["""verification_status"""] = """Needs Manual Review"""
             else: # fraud_score > 0.50
                 campaign_data["""verification_status"""] = """Rejected"""
-                # If rejected, skip adding to batch and Algolia
+                # If rejected, skip adding to campaigns and Algolia; keep it so copies are caught by the pre-filter
+                rejected_doc_ref = db.collection("""rejected_campaigns""").document()
+                batch.set(rejected_doc_ref, campaign_data)
+                campaign_dedup_index.add(rejected_doc_ref.id, campaign_data["""description"""])
                 failed_count += 1
                 errors.append(f"""Campaign '{campaign_data_req.name}' rejected due to high fraud risk (score: {fraud_score:.2f}).""")
                 continue # Skip to the next campaign in the loop
 
             new_doc_ref = db.collection("""campaigns""").document()
-            batch.set(new_doc_ref, campaign_with_defaults)
+            batch.set(new_doc_ref, campaign_data)
 
-            algolia_object = {**campaign_with_defaults, """objectID""": new_doc_ref.id}
+            algolia_object = {**campaign_data, """objectID""": new_doc_ref.id}
             algolia_objects_to_save.append(algolia_object)
+            uploaded_campaigns.append((new_doc_ref.id, campaign_data))
 
             uploaded_count += 1
         except Exception as e:
@@ -691,6 +1072,8 @@ async def bulk_upload_campaigns(request: CampaignBulkUploadRequest, current_user
             errors.append(f"""Failed to upload campaign '{campaign_data_req.name}': {e}""")
 
     batch.commit()
+    for campaign_id, campaign_data in uploaded_campaigns:
+        queue_pretranslation(campaign_id, campaign_data)
 
     if algolia_index and algolia_objects_to_save:
         try:
@@ -815,40 +1198,182 @@ async def initiate_payment(
         print(f"""Error initiating payment: {e}""")
         raise HTTPException(status_code=500, detail=f"""Failed to initiate payment: {e}""")
 
+class RegistryRefreshRequest(BaseModel):
+    source_paths: List[str]  # CSV/Parquet registry dumps readable by the server
+    id_type: Optional[str] = None  # e.g. 'pan', for dumps without an id_type column
+
+@app.post("""/admin/registry/refresh""")
+async def refresh_registry_snapshot(
+    request: RegistryRefreshRequest,
+    current_user: UserInfo = Depends(get_admin_user)
+):
+    from fraud_detection import registry_index # Local import
+    if not registry_index.path:
+        raise HTTPException(status_code=400, detail="""REGISTRY_SNAPSHOT_PATH is not configured.""")
+    try:
+        metadata = await asyncio.get_running_loop().run_in_executor(
+            None, registry_index.refresh, request.source_paths, request.id_type
+        )
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"""Failed to refresh registry snapshot: {e}""")
+    return {"""message""": """Registry snapshot refreshed.""", """metadata""": metadata}
+
+@app.get("""/admin/registry""")
+async def get_registry_snapshot(current_user: UserInfo = Depends(get_admin_user)):
+    from fraud_detection import registry_index # Local import
+    return registry_index.stats()
+
+@app.post("""/admin/verifications/{doc_id}/review""")
+async def review_verification(
+    doc_id: str,
+    request: ReviewDecisionRequest,
+    current_user: UserInfo = Depends(get_admin_user)
+):
+    if not db: raise HTTPException(status_code=500, detail="""Firestore not initialized.""")
+    if request.decision not in ("""legitimate""", """fraud"""):
+        raise HTTPException(status_code=400, detail="""Decision must be 'legitimate' or 'fraud'.""")
+
+    doc_ref = db.collection("""organization_verifications""").document(doc_id)
+    doc = doc_ref.get()
+    if not doc.exists:
+        raise HTTPException(status_code=404, detail="""Verification not found.""")
+    doc_ref.update({
+        """review_label""": 1 if request.decision == """fraud""" else 0,
+        """review_notes""": request.notes,
+        """verification_status""": """Rejected by Reviewer""" if request.decision == """fraud""" else """Verified by Reviewer""",
+        """reviewed_by_uid""": current_user.uid,
+        """reviewed_at""": firestore.SERVER_TIMESTAMP
+    })
+
+    # Reviewed fraud becomes a near-duplicate reference, and cleared texts stop being one
+    from fraud_detection import explanation_id, fraud_model # Local import
+    text = doc.to_dict().get("""text""")
+    if fraud_model.embedding_store is not None and text:
+        from embedding_store import LABEL_FRAUD, LABEL_LEGITIMATE # Local import
+        fraud_model.embedding_store.set_label(explanation_id(text), LABEL_FRAUD if request.decision == """fraud""" else LABEL_LEGITIMATE)
+
+    return {"""message""": f"""Verification {doc_id} marked as {request.decision}."""}
+
+@app.post("""/admin/fraud-model/incremental-update""")
+async def start_incremental_update(current_user: UserInfo = Depends(get_admin_user)):
+    if not db: raise HTTPException(status_code=500, detail="""Firestore not initialized.""")
+    if training_in_progress():
+        raise HTTPException(status_code=409, detail="""A fraud model training job is already running.""")
+
+    from incremental_update import fetch_review_examples, reviewed_through, write_review_examples # Local import
+    since = reviewed_through(FRAUD_MODEL_ROOT)
+    examples = await asyncio.get_running_loop().run_in_executor(
+        None, fetch_review_examples, db.collection("""organization_verifications"""), since
+    )
+    if len(examples) < FRAUD_INCREMENTAL_MIN_REVIEWS:
+        return {"""message""": f"""Only {len(examples)} new review outcomes; need {FRAUD_INCREMENTAL_MIN_REVIEWS}.""", """started""": False}
+
+    os.makedirs(FRAUD_MODEL_ROOT, exist_ok=True)
+    reviews_path = os.path.join(FRAUD_MODEL_ROOT, f"""reviews-{int(time.time())}.csv""")
+    write_review_examples(examples, reviews_path)
+    process = _start_training_process(
+        """incremental_update.py""", """--reviews""", reviews_path, """--replay-ratio""", str(FRAUD_REPLAY_RATIO)
+    )
+    return {"""message""": """Incremental update started.""", """started""": True, """review_examples""": len(examples), """pid""": process.pid}
+
+@app.get("""/inference-stats""")
+async def get_inference_stats(current_user: UserInfo = Depends(get_admin_user)):
+    from fraud_detection import fraud_model # Local import
+    return {
+        """fraud_scheduler""": fraud_scheduler.stats(),
+        """fraud_prediction_cache""": await fraud_prediction_cache_stats(),
+        """campaign_dedup_index""": campaign_dedup_index.stats(),
+        """translation_cache""": translation_cache.stats(),
+        """pretranslation""": pretranslation_queue.stats(),
+        """translation_memory""": translation_memory.stats(),
+        """translation_ttft_ms""": translation_ttft_ms.snapshot(),
+        """translation_stream_ms""": translation_stream_ms.snapshot(),
+        """fraud_embedding_store""": fraud_model.embedding_store.stats() if fraud_model.embedding_store is not None else None,
+        """inference_pool""": inference_pool.stats()
+    }
+
+@app.get("""/startup-profile""")
+async def get_startup_profile(top: int = 25, current_user: UserInfo = Depends(get_admin_user)):
+    """Import timings, startup phases and RSS of this process (see startup_profiler.py)."""
+    return startup_profiler.report(top)
+
+@app.get("""/ready""")
+async def readiness():
+    """Readiness probe: 200 once the models are loaded and warmed up, 503 before that."""
+    return JSONResponse(status_code=200 if startup_state["""ready"""] else 503, content=startup_state)
+
 @app.on_event("""startup""")
 async def startup_event():
-    global indictrans2_model, indictrans2_tokenizer, indictrans2_processor
-
-    if not db:
-        print("""Firestore not initialized, skipping initial data population.""")
-        return
+    global indictrans2_translator, indictrans2_processor
+    # Time between the module import and the server calling startup_event
+    startup_profiler.mark("""server-boot""")
 
     # --- Initialize IndicTrans2 Model ---
+    startup_state["""phase"""] = """loading-models"""
     try:
         # Choose the appropriate model. For English to Indic translation:
-        model_name = """ai4bharat/indictrans2-en-indic-1B"""
-        print(f"""Loading IndicTrans2 model '{model_name}' on {DEVICE}...""")
-        indictrans2_tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
-        indictrans2_model = AutoModelForSeq2SeqLM.from_pretrained(model_name, trust_remote_code=True).to(DEVICE)
+        model_name = DEFAULT_MODEL_NAME
+        print(f"""Loading IndicTrans2 model '{model_name}' ({INDICTRANS2_ENGINE}) on {DEVICE}...""")
+        indictrans2_translator = load_translator(INDICTRANS2_ENGINE, model_name, DEVICE, INDICTRANS2_CT2_DIR,
+                                                 INDICTRANS2_COMPILE)
         indictrans2_processor = IndicProcessor(build_map_filename=True)
-        print("""IndicTrans2 model loaded successfully.""")
+        print(f"""IndicTrans2 model loaded successfully ({indictrans2_translator.engine}).""")
     except Exception as e:
         print(f"""CRITICAL ERROR: Could not load IndicTrans2 model: {e}""")
         print("""Translation functionality will be unavailable.""")
-        indictrans2_model = None
-        indictrans2_tokenizer = None
+        indictrans2_translator = None
         indictrans2_processor = None
+    startup_profiler.mark("""indictrans2-load""")
+    if TRANSLATION_MEMORY_ENABLED:
+        translation_memory.load()
+        startup_profiler.mark("""translation-memory-load""")
 
 
-    from fraud_detection_verified import fine_tune_model, predict_fraud # Local import
+    from fraud_detection import fraud_model # Local import
 
-    # Changed dataset_path from "social_media_fraud.csv" to "ngo_fraud.csv"
-    if not os.path.exists("""./distilbert-fraud-finetuned""") or not os.listdir("""./distilbert-fraud-finetuned"""):
-        print("""Fine-tuning fraud detection model on startup...""")
-        fine_tune_model(dataset_path="""ngo_fraud.csv""", k_folds=1)
-        print("""Fraud detection model fine-tuned.""")
+    # Never block startup on training: serve the current (or dummy) model and hot-swap when training publishes
+    if not fraud_model.fine_tuned:
+        if FRAUD_TRAIN_ON_STARTUP:
+            print("""No fine-tuned fraud model yet; training in the background...""")
+            start_background_training(dataset_path="""ngo_fraud.csv""", k_folds=1)
+        else:
+            print("""No fine-tuned fraud model and FRAUD_TRAIN_ON_STARTUP is off; serving dummy predictions.""")
     else:
-        print("""Fraud detection model already fine-tuned.""")
+        print(f"""Fraud detection model already fine-tuned ({fraud_model.model_dir}).""")
+    startup_profiler.mark("""fraud-model-check""")
+
+    # Index the known-fraud campaigns of the training data the first time the pre-filter runs
+    if not len(campaign_dedup_index) and os.path.exists("""ngo_fraud.csv"""):
+        print(f"""Seeded campaign pre-filter with {seed_from_dataset(campaign_dedup_index, 'ngo_fraud.csv')} known-fraud campaigns.""")
+    startup_profiler.mark("""campaign-prefilter-seed""")
+
+    # Load (and compile) the models now and run them on representative shapes, so the
+    # first real /fraud-check or /translate request doesn't pay for graph capture
+    startup_state["""phase"""] = """warming-up"""
+    fraud_model.load()
+    startup_profiler.mark("""fraud-model-load""")
+    startup_state["""warmup"""]["""fraud_model"""] = fraud_model.warmup()
+    startup_profiler.mark("""fraud-model-warmup""")
+    if indictrans2_translator:
+        startup_state["""warmup"""]["""indictrans2"""] = warmup_indictrans2()
+        startup_profiler.mark("""indictrans2-warmup""")
+
+    # Fork inference workers only now, so they inherit the loaded, warmed IndicTrans2 and fraud models,
+    # and before any other thread (the model watcher, explanation and executor threads) exists
+    if INFERENCE_WORKERS > 0:
+        inference_pool.start()
+        startup_profiler.mark("""inference-pool-start""")
+    model_watcher.start()
+    if indictrans2_translator and PRETRANSLATE_ENABLED:
+        pretranslation_queue.start()
+    startup_state.update({"""ready""": True, """phase""": """ready"""})
+
+    # Everything above serves without Firestore; only the initial campaign data needs it
+    if not db:
+        print("""Firestore not initialized, skipping initial data population.""")
+        startup_profiler.stop_import_timing()
+        startup_profiler.emit(path=STARTUP_PROFILE_PATH)
+        return
 
     campaigns_ref = db.collection("""campaigns""")
     if not campaigns_ref.limit(1).get():
@@ -865,8 +1390,9 @@ async def startup_event():
         ]
         batch = db.batch()
         algolia_initial_objects = []
+        seed_organizations = []
         for campaign in sample_campaigns:
-            org_data_for_fraud_check = {
+            seed_organizations.append({
                 """org_name""": campaign["""author"""],
                 """bio""": campaign["""description"""],
                 """follower_count""": random.randint(100, 5000),
@@ -879,11 +1405,11 @@ async def startup_event():
                 """registration_number""": """U12345ABCDE67890FGHIJ""" if random.random() > 0.1 else """""",
                 """ngo_darpan_id""": """UP1234567890""" if random.random() > 0.1 else """""",
                 """fcra_number""": """1234567890""" if random.random() > 0.1 else """"""
-            }
-            fraud_score, explanation, plot_path, verification_details = predict_fraud(
-                organization_data=org_data_for_fraud_check
-            )
+            })
+        # Scored together through the micro-batching scheduler and the inference pool
+        seed_predictions = await asyncio.gather(*(score_fraud(organization) for organization in seed_organizations))
 
+        for campaign, (fraud_score, explanation, plot_path, verification_details) in zip(sample_campaigns, seed_predictions):
             # Determine verification status based on new grading for initial data
             verification_status = ""
             if fraud_score <= 0.20:
@@ -921,6 +1447,17 @@ async def startup_event():
                 print(f"""Error indexing initial campaigns in Algolia: {e}""")
     else:
         print("""Firestore 'campaigns' collection already has data. Skipping initial population.""")
+    startup_profiler.mark("""campaign-seed""")
+
+    startup_profiler.stop_import_timing()
+    startup_profiler.emit(path=STARTUP_PROFILE_PATH)
+
+
+@app.on_event("""shutdown""")
+async def shutdown_event():
+    pretranslation_queue.stop()
+    model_watcher.stop()
+    inference_pool.shutdown()
 
 
 if __name__ == """__main__""":
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""metrics.py
+
+Minimal in-process metrics shared by the HAVEN backend's inference components.
+Values are exported as plain dicts so they can be returned from FastAPI endpoints.
+"""
+
+import bisect
+import threading
+from typing import List, Optional
+
+
+class Histogram:
+    """
+    Thread-safe fixed-bucket histogram.
+
+    Bucket counts are cumulative in the exported snapshot (Prometheus-style),
+    with a final "+Inf" bucket that always equals the total count.
+    """
+
+    def __init__(self, name: str, buckets: List[float], unit: Optional[str] = None):
+        self.name = name
+        self.unit = unit
+        self._bounds = sorted(buckets)
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self._count, self._sum
+
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self._bounds + [float("inf")], counts):
+            cumulative += bucket_count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+
+        return {
+            'name': self.name,
+            'unit': self.unit,
+            'count': count,
+            'sum': total,
+            'mean': (total / count) if count else 0.0,
+            'buckets': buckets
+        }
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
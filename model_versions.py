@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""model_versions.py
+
+Versioned model directories with an atomically updated CURRENT pointer.
+
+Training jobs write each model to a fresh directory under the model root
+(e.g. ./fraud-models/v20260101-120000) and then publish it by replacing the
+CURRENT file, which holds the name of the live version. Servers watch CURRENT
+and hot-swap to the new version without restarting.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+DEFAULT_MODEL_ROOT = "./fraud-models"
+POINTER_FILE = "CURRENT"
+METADATA_FILE = "version.json"
+
+
+def new_version_dir(model_root: str = DEFAULT_MODEL_ROOT) -> str:
+    """Path for a new, not yet published version (named by UTC timestamp)."""
+    os.makedirs(model_root, exist_ok=True)
+    name = datetime.utcnow().strftime("v%Y%m%d-%H%M%S")
+    path = os.path.join(model_root, name)
+    suffix = 1
+    while os.path.exists(path):
+        path = os.path.join(model_root, f"{name}-{suffix}")
+        suffix += 1
+    return path
+
+
+def current_version_dir(model_root: str = DEFAULT_MODEL_ROOT) -> Optional[str]:
+    """Directory of the published version, or None if nothing has been published yet."""
+    try:
+        with open(os.path.join(model_root, POINTER_FILE), encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    path = os.path.join(model_root, name)
+    return path if name and os.path.isdir(path) else None
+
+
+def publish_version(version_dir: str, model_root: str = DEFAULT_MODEL_ROOT):
+    """Atomically points CURRENT at `version_dir`, which must be a fully written directory under model_root."""
+    fd, tmp_path = tempfile.mkstemp(prefix=".current-", dir=model_root)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(os.path.basename(os.path.normpath(version_dir)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(model_root, POINTER_FILE))
+    print(f"Published model version {version_dir}")
+
+
+def write_version_metadata(version_dir: str, metadata: dict):
+    """Records how a version was produced (e.g. its parent version and training data) next to its weights."""
+    with open(os.path.join(version_dir, METADATA_FILE), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2, default=str)
+
+
+def read_version_metadata(version_dir: Optional[str]) -> dict:
+    if not version_dir:
+        return {}
+    try:
+        with open(os.path.join(version_dir, METADATA_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def list_versions(model_root: str = DEFAULT_MODEL_ROOT) -> List[str]:
+    if not os.path.isdir(model_root):
+        return []
+    return sorted(
+        os.path.join(model_root, name) for name in os.listdir(model_root)
+        if name.startswith("v") and os.path.isdir(os.path.join(model_root, name))
+    )
+
+
+def prune_versions(model_root: str = DEFAULT_MODEL_ROOT, keep: int = 3):
+    """Deletes all but the newest `keep` versions, never the published one."""
+    current = current_version_dir(model_root)
+    for path in list_versions(model_root)[:-keep] if keep > 0 else []:
+        if current and os.path.samefile(path, current):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class ModelWatcher:
+    """
+    Polls the CURRENT pointer in a daemon thread and calls `on_change(version_dir)`
+    whenever a different version is published.
+    """
+
+    def __init__(self, on_change: Callable[[str], None], model_root: str = DEFAULT_MODEL_ROOT,
+                 interval: float = 10.0):
+        self.on_change = on_change
+        self.model_root = model_root
+        self.interval = interval
+        self._seen = current_version_dir(model_root)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            version_dir = current_version_dir(self.model_root)
+            if version_dir is None or version_dir == self._seen:
+                continue
+            print(f"New model version detected: {version_dir}")
+            started = time.perf_counter()
+            try:
+                self.on_change(version_dir)
+                self._seen = version_dir
+                print(f"Swapped to model version {version_dir} in {time.perf_counter() - started:.1f}s.")
+            except Exception as e:
+                # Keep serving the old version; the next poll retries the swap
+                print(f"Error swapping to model version {version_dir}: {e}")
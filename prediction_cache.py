@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""prediction_cache.py
+
+Content-addressed cache for fraud predictions.
+
+Entries are keyed by a hash of the normalized organization text, its
+registration identifiers and the model version, so a new model version never
+sees predictions made by an older one. A bounded in-memory LRU tier sits in
+front of an optional SQLite tier that survives restarts; both honour a TTL.
+Each process opens its own SQLite connection on first use, because a
+connection must not be carried across fork() into the inference workers.
+"""
+
+import collections
+import copy
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from metrics import Counter
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercases and collapses whitespace; the uncased tokenizer treats these variants identically."""
+    return _WHITESPACE.sub(" ", (text or "")).strip().lower()
+
+
+class PredictionCache:
+    """
+    Two-tier (memory LRU + optional on-disk SQLite) cache of prediction results.
+
+    Args:
+        max_entries (int): Capacity of the in-memory LRU tier; 0 disables caching entirely.
+        ttl_seconds (float): Entries older than this are treated as misses and dropped.
+        disk_path (str): SQLite file for the persistent tier (optional).
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 86400.0, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self._memory = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = os.getpid()
+
+        self.hits = Counter("prediction_cache_hits")
+        self.disk_hits = Counter("prediction_cache_disk_hits")
+        self.misses = Counter("prediction_cache_misses")
+        self.evictions = Counter("prediction_cache_evictions")
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _check_pid(self):
+        # A forked child must not reuse the parent's connection, nor a lock a parent thread may have held
+        if self._pid != os.getpid():
+            self._lock = threading.Lock()
+            self._db = None
+            self._pid = os.getpid()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        # Caller holds self._lock
+        if self._db is None and self.disk_path and self.enabled:
+            self._db = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, model_version TEXT, created_at REAL, value TEXT)"
+            )
+            self._db.commit()
+        return self._db
+
+    @staticmethod
+    def make_key(text: str, identifiers: dict, model_version: str) -> str:
+        payload = json.dumps([normalize_text(text), identifiers, model_version], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.ttl_seconds) and (time.time() - created_at) > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+
+        self._check_pid()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if not self._expired(created_at):
+                    self._memory.move_to_end(key)
+                    self.hits.inc()
+                    return copy.deepcopy(value)
+                del self._memory[key]
+
+            db = self._connection()
+            if db is not None:
+                row = db.execute("SELECT created_at, value FROM predictions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    created_at, value = row
+                    if not self._expired(created_at):
+                        value = tuple(json.loads(value))
+                        self._remember(key, created_at, value)
+                        self.hits.inc()
+                        self.disk_hits.inc()
+                        return copy.deepcopy(value)
+                    db.execute("DELETE FROM predictions WHERE key = ?", (key,))
+                    db.commit()
+
+        self.misses.inc()
+        return None
+
+    def put(self, key: str, value: tuple, model_version: str = ""):
+        if not self.enabled:
+            return
+
+        created_at = time.time()
+        self._check_pid()
+        with self._lock:
+            self._remember(key, created_at, copy.deepcopy(value))
+            db = self._connection()
+            if db is not None:
+                db.execute(
+                    "INSERT OR REPLACE INTO predictions (key, model_version, created_at, value) VALUES (?, ?, ?, ?)",
+                    (key, model_version, created_at, json.dumps(value, default=str))
+                )
+                db.commit()
+
+    def _remember(self, key: str, created_at: float, value: tuple):
+        # Caller holds self._lock
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions.inc()
+
+    def purge_other_versions(self, model_version: str):
+        """Drops on-disk entries written by any other model version; they can never be hit again."""
+        self._check_pid()
+        with self._lock:
+            self._memory.clear()
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM predictions WHERE model_version != ?", (model_version,))
+                db.commit()
+
+    def clear(self):
+        self._check_pid()
+        with self._lock:
+            self._memory.clear()
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM predictions")
+                db.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits.value + self.misses.value
+        disk_entries = None
+        self._check_pid()
+        with self._lock:
+            db = self._connection()
+            if db is not None:
+                disk_entries = db.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        return {
+            'enabled': self.enabled,
+            'memory_entries': len(self._memory),
+            'max_entries': self.max_entries,
+            'disk_entries': disk_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits.value,
+            'disk_hits': self.disk_hits.value,
+            'misses': self.misses.value,
+            'evictions': self.evictions.value,
+            'hit_rate': (self.hits.value / lookups) if lookups else 0.0
+        }
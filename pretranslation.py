@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""pretranslation.py
+
+Eager background pre-translation of new campaigns.
+
+When a campaign is created, its translatable fields are queued for every
+supported language, so browsing in a language finds the translations already
+in the translation cache (see translation_cache.py) instead of waiting for
+beam search in the request path.
+
+Jobs are queued per language. Each worker repeatedly takes up to batch_size
+jobs of a single language, so every batch is one language pair that
+translate_batch can pad and decode together. Workers always serve the
+language users request most (counted by record_request) that still has
+pending jobs. Jobs whose translation is already cached for the current source
+text are skipped. Progress is kept per campaign and per language.
+"""
+
+import asyncio
+import collections
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+from metrics import Counter, Histogram
+from translation_engine import is_translation_error
+
+DEFAULT_FIELDS = ("name", "description")
+
+
+class PretranslationQueue:
+    """
+    Per-language job queues drained by asyncio workers in batches.
+
+    Args:
+        translate_fn (callable): Takes [(text, source_lang, target_lang)] and returns the translations.
+        cache: TranslationCache the results are looked up in and written to.
+        languages (list): Target languages, in tie-break priority order.
+        source_language (str): Language of the campaign text.
+        workers (int): Concurrent batches.
+        batch_size (int): Jobs per translate_fn call.
+        runner (callable): Optional coroutine function runner(translate_fn, items), e.g. the
+            inference pool; None runs translate_fn in the event loop's default thread pool.
+        max_tracked_campaigns (int): Campaigns whose progress is remembered.
+    """
+
+    def __init__(self, translate_fn: Callable[[List[tuple]], List[str]], cache, languages: Sequence[str],
+                 source_language: str = "en", workers: int = 1, batch_size: int = 32,
+                 runner: Optional[Callable[[Callable, List[tuple]], Awaitable[List[str]]]] = None,
+                 max_tracked_campaigns: int = 10000):
+        self.translate_fn = translate_fn
+        self.cache = cache
+        self.languages = list(languages)
+        self.source_language = source_language
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.runner = runner
+        self.max_tracked_campaigns = max_tracked_campaigns
+
+        self._queues: Dict[str, collections.deque] = {language: collections.deque() for language in self.languages}
+        self._requests = collections.Counter()
+        self._progress = collections.OrderedDict()
+        self._pending = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.translated = Counter("pretranslation_translated")
+        self.skipped = Counter("pretranslation_already_cached")
+        self.failed = Counter("pretranslation_failed")
+        self.batch_seconds = Histogram("pretranslation_batch_seconds", [0.5, 1, 2, 5, 10, 30, 60, 120, 300], unit="s")
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        """Starts the workers on the running event loop; jobs queued before this are kept."""
+        if self._tasks:
+            return
+        self._pending = asyncio.Event()
+        if self.queue_depth():
+            self._pending.set()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        print(f"Pre-translation started: {self.workers} workers, {len(self.languages)} languages.")
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def record_request(self, language: str):
+        """Counts a user request in `language`; pending jobs of the most requested languages run first."""
+        if language in self._queues:
+            self._requests[language] += 1
+
+    def enqueue(self, campaign_id: str, fields: Dict[str, str]) -> int:
+        """Queues every non-empty field of a campaign for every language. Returns the number of jobs queued."""
+        fields = {field: text for field, text in fields.items() if text}
+        if not fields:
+            return 0
+        self._progress[campaign_id] = {
+            'queued_at': time.time(),
+            'finished_at': None,
+            'languages': {language: {'total': len(fields), 'done': 0, 'failed': 0} for language in self.languages}
+        }
+        self._progress.move_to_end(campaign_id)
+        while len(self._progress) > self.max_tracked_campaigns:
+            self._progress.popitem(last=False)
+
+        for language in self.languages:
+            for field, text in fields.items():
+                self._queues[language].append((campaign_id, field, text))
+        if self._pending is not None:
+            self._pending.set()
+        return len(fields) * len(self.languages)
+
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _next_language(self) -> Optional[str]:
+        waiting = [language for language in self.languages if self._queues[language]]
+        if not waiting:
+            return None
+        # Most requested first; ties keep the configured order
+        return max(waiting, key=lambda language: (self._requests[language], -self.languages.index(language)))
+
+    def _take_batch(self) -> tuple:
+        language = self._next_language()
+        if language is None:
+            return None, []
+        queue = self._queues[language]
+        jobs = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+        if not self.queue_depth():
+            self._pending.clear()
+        return language, jobs
+
+    def _record(self, language: str, jobs: Sequence[tuple], outcome: str):
+        for campaign_id, _, _ in jobs:
+            progress = self._progress.get(campaign_id)
+            if progress is None:
+                continue
+            progress['languages'][language][outcome] += 1
+            if all(counts['done'] + counts['failed'] >= counts['total'] for counts in progress['languages'].values()):
+                progress['finished_at'] = time.time()
+
+    async def _translate(self, language: str, jobs: List[tuple]):
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, self.cache.get_many,
+                                            [(campaign_id, field, language, text) for campaign_id, field, text in jobs])
+        done = [job for job, translation in zip(jobs, cached) if translation is not None]
+        todo = [job for job, translation in zip(jobs, cached) if translation is None]
+        self.skipped.inc(len(done))
+        self._record(language, done, 'done')
+        if not todo:
+            return
+
+        started = time.perf_counter()
+        items = [(text, self.source_language, language) for _, _, text in todo]
+        if self.runner is not None:
+            translations = await self.runner(self.translate_fn, items)
+        else:
+            translations = await loop.run_in_executor(None, self.translate_fn, items)
+        # translate_fn returns placeholders instead of raising; those jobs failed and stay uncached
+        translated = [(job, translation) for job, translation in zip(todo, translations)
+                      if not is_translation_error(translation)]
+        failed = [job for job, translation in zip(todo, translations) if is_translation_error(translation)]
+        await loop.run_in_executor(None, self.cache.put_many, [
+            (campaign_id, field, language, text, translation)
+            for (campaign_id, field, text), translation in translated
+        ])
+        self.batch_seconds.observe(time.perf_counter() - started)
+        self.translated.inc(len(translated))
+        self.failed.inc(len(failed))
+        self._record(language, [job for job, _ in translated], 'done')
+        self._record(language, failed, 'failed')
+
+    async def _worker(self):
+        while True:
+            await self._pending.wait()
+            language, jobs = self._take_batch()
+            if not jobs:
+                continue
+            try:
+                await self._translate(language, jobs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error pre-translating {len(jobs)} texts into {language}: {e}")
+                self.failed.inc(len(jobs))
+                self._record(language, jobs, 'failed')
+
+    def progress(self, campaign_id: str) -> Optional[dict]:
+        """Per-language and overall progress of a queued campaign, or None if it isn't tracked."""
+        progress = self._progress.get(campaign_id)
+        if progress is None:
+            return None
+        languages = progress['languages']
+        total = sum(counts['total'] for counts in languages.values())
+        done = sum(counts['done'] for counts in languages.values())
+        failed = sum(counts['failed'] for counts in languages.values())
+        return {
+            'campaign_id': campaign_id,
+            'total': total,
+            'done': done,
+            'failed': failed,
+            'percent': round(100.0 * (done + failed) / total, 1) if total else 100.0,
+            'queued_at': progress['queued_at'],
+            'finished_at': progress['finished_at'],
+            'languages': {language: dict(counts) for language, counts in languages.items()}
+        }
+
+    def stats(self) -> dict:
+        return {
+            'started': self.started,
+            'workers': self.workers,
+            'batch_size': self.batch_size,
+            'queue_depth': {language: len(queue) for language, queue in self._queues.items() if queue},
+            'language_requests': dict(self._requests.most_common()),
+            'translated': self.translated.value,
+            'already_cached': self.skipped.value,
+            'failed': self.failed.value,
+            'batch_seconds': self.batch_seconds.snapshot()
+        }
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""registry_index.py
+
+Offline registry snapshots for verify_organization_india.
+
+Bulk registry dumps (PAN, MCA CIN, NGO Darpan, FCRA; CSV or Parquet with
+columns id_type, identifier, name, status) are compiled into a single file:
+
+    header | metadata JSON | Bloom filter bits | open-addressing slot table | records
+
+The file is memory-mapped, so lookups need no parsing or loading step: a Bloom
+filter probe rejects most unknown identifiers, and known ones are found with a
+few linear probes in the slot table. Refreshing writes a new file next to the
+old one and os.replace()s it into place; every process notices the new inode
+on its next lookup and swaps snapshots without a restart.
+
+Usage:
+    python registry_index.py build registry.idx pan_dump.csv darpan.parquet
+    python registry_index.py lookup registry.idx pan ABCDE1234F --name "Shiksha Foundation"
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+MAGIC = b"HVREG001"
+# magic, metadata length, bloom bytes, bloom hashes, slot count, record count
+_HEADER = struct.Struct("<8sQQIQQ")
+_SLOT = struct.Struct("<QQ")
+_RECORD_HEADER = struct.Struct("<BHH")
+
+ACTIVE_STATUSES = {"active", "registered", "approved", "valid", "verified"}
+_STATUS_CODES = {"active": 1, "inactive": 2, "cancelled": 3, "suspended": 4, "struck off": 5, "unknown": 0}
+_STATUS_NAMES = {code: name for name, code in _STATUS_CODES.items()}
+
+_NON_ALNUM = re.compile(r"[^0-9A-Za-z]+")
+
+
+def normalize_identifier(identifier: str) -> str:
+    return _NON_ALNUM.sub("", str(identifier or "")).upper()
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(_NON_ALNUM.sub(" ", str(name or "")).lower().split())
+
+
+def _status_code(status: str) -> int:
+    status = str(status or "").strip().lower()
+    if status in ACTIVE_STATUSES:
+        return _STATUS_CODES["active"]
+    return _STATUS_CODES.get(status, _STATUS_CODES["inactive"] if status else _STATUS_CODES["unknown"])
+
+
+def _key(id_type: str, identifier: str) -> bytes:
+    return f"{id_type.strip().lower()}:{normalize_identifier(identifier)}".encode("utf-8")
+
+
+def _hashes(key: bytes) -> Tuple[int, int]:
+    digest = hashlib.blake2b(key, digest_size=16).digest()
+    h1, h2 = struct.unpack("<QQ", digest)
+    # 0 marks an empty slot, so real keys never hash to it
+    return h1 | 1, h2 | 1
+
+
+def _read_rows(source: str) -> Iterable[dict]:
+    if source.endswith(".parquet"):
+        import pandas as pd
+        for row in pd.read_parquet(source).fillna("").to_dict("records"):
+            yield row
+    else:
+        with open(source, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield row
+
+
+def build_snapshot(sources: List[str], output_path: str, default_id_type: Optional[str] = None,
+                   false_positive_rate: float = 0.01) -> dict:
+    """
+    Compiles registry dumps into a snapshot file at `output_path`, atomically replacing any existing one.
+
+    Args:
+        sources (list): CSV/Parquet files with identifier, name, status and (optionally) id_type columns.
+        output_path (str): Snapshot file to write.
+        default_id_type (str): id_type for rows whose source has no id_type column (e.g. "pan").
+        false_positive_rate (float): Target false-positive rate of the Bloom filter.
+
+    Returns:
+        dict: The snapshot metadata.
+    """
+    records = {}
+    for source in sources:
+        for row in _read_rows(source):
+            id_type = str(row.get("id_type") or default_id_type or "").strip().lower()
+            identifier = normalize_identifier(row.get("identifier"))
+            if not id_type or not identifier:
+                continue
+            records[_key(id_type, identifier)] = (str(row.get("name") or ""), _status_code(row.get("status")))
+
+    count = max(1, len(records))
+    bloom_bits = max(64, int(math.ceil(-count * math.log(false_positive_rate) / (math.log(2) ** 2))))
+    bloom_bytes = (bloom_bits + 7) // 8
+    bloom_hashes = max(1, int(round(bloom_bytes * 8 / count * math.log(2))))
+    slot_count = 1 << max(4, (count * 2 - 1).bit_length())  # load factor <= 0.5
+
+    metadata = {
+        'created_at': time.time(),
+        'sources': [os.path.basename(source) for source in sources],
+        'records': len(records),
+        'id_types': sorted({key.split(b":", 1)[0].decode("utf-8") for key in records})
+    }
+    metadata_bytes = json.dumps(metadata).encode("utf-8")
+
+    bloom = bytearray(bloom_bytes)
+    slots = bytearray(slot_count * _SLOT.size)
+    record_blob = bytearray()
+    for key, (name, status) in records.items():
+        h1, h2 = _hashes(key)
+        for i in range(bloom_hashes):
+            bit = (h1 + i * h2) % (bloom_bytes * 8)
+            bloom[bit >> 3] |= 1 << (bit & 7)
+
+        name_bytes = name.encode("utf-8")[:65535]
+        offset = len(record_blob)
+        record_blob += _RECORD_HEADER.pack(status, len(key), len(name_bytes)) + key + name_bytes
+
+        slot = h1 & (slot_count - 1)
+        while _SLOT.unpack_from(slots, slot * _SLOT.size)[0] != 0:
+            slot = (slot + 1) & (slot_count - 1)
+        _SLOT.pack_into(slots, slot * _SLOT.size, h1, offset)
+
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".registry-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, len(metadata_bytes), bloom_bytes, bloom_hashes, slot_count, len(records)))
+            f.write(metadata_bytes)
+            f.write(bloom)
+            f.write(slots)
+            f.write(record_blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, output_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    print(f"Registry snapshot with {len(records)} records written to {output_path}")
+    return metadata
+
+
+class RegistrySnapshot:
+    """Read-only, memory-mapped view of one snapshot file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._inode = os.fstat(f.fileno()).st_ino
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, metadata_length, self._bloom_bytes, self._bloom_hashes, self._slot_count, _ = \
+            _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a registry snapshot.")
+        offset = _HEADER.size
+        self.metadata = json.loads(self._mmap[offset:offset + metadata_length])
+        self._bloom_offset = offset + metadata_length
+        self._slots_offset = self._bloom_offset + self._bloom_bytes
+        self._records_offset = self._slots_offset + self._slot_count * _SLOT.size
+        self.id_types = set(self.metadata.get('id_types', []))
+
+    def covers(self, id_type: str) -> bool:
+        return id_type in self.id_types
+
+    def _might_contain(self, h1: int, h2: int) -> bool:
+        bits = self._bloom_bytes * 8
+        for i in range(self._bloom_hashes):
+            bit = (h1 + i * h2) % bits
+            if not self._mmap[self._bloom_offset + (bit >> 3)] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def get(self, id_type: str, identifier: str) -> Optional[Tuple[str, str]]:
+        """Returns (registered name, status) or None if the identifier is not in the snapshot."""
+        key = _key(id_type, identifier)
+        h1, h2 = _hashes(key)
+        if not self._might_contain(h1, h2):
+            return None
+
+        mask = self._slot_count - 1
+        slot = h1 & mask
+        while True:
+            slot_hash, record_offset = _SLOT.unpack_from(self._mmap, self._slots_offset + slot * _SLOT.size)
+            if slot_hash == 0:
+                return None
+            if slot_hash == h1:
+                position = self._records_offset + record_offset
+                status, key_length, name_length = _RECORD_HEADER.unpack_from(self._mmap, position)
+                position += _RECORD_HEADER.size
+                if self._mmap[position:position + key_length] == key:
+                    position += key_length
+                    name = self._mmap[position:position + name_length].decode("utf-8")
+                    return name, _STATUS_NAMES.get(status, "unknown")
+            slot = (slot + 1) & mask
+
+
+class RegistryIndex:
+    """
+    Holds the current snapshot for `path` and swaps to a new one when the file is replaced.
+
+    Args:
+        path (str): Snapshot file; the index is empty until it exists.
+        check_interval (float): Minimum seconds between checks for a replaced file.
+    """
+
+    def __init__(self, path: Optional[str], check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot: Optional[RegistrySnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current(self) -> Optional[RegistrySnapshot]:
+        if not self.path:
+            return None
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._snapshot
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                inode = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                return self._snapshot
+            if self._snapshot is None or self._snapshot._inode != inode:
+                try:
+                    # Readers holding the old snapshot keep using it; its mmap closes once they drop it
+                    self._snapshot = RegistrySnapshot(self.path)
+                    print(f"Registry snapshot loaded from {self.path} ({self._snapshot.metadata.get('records')} records).")
+                except Exception as e:
+                    print(f"Error loading registry snapshot {self.path}: {e}")
+            return self._snapshot
+
+    @property
+    def loaded(self) -> bool:
+        return self._current() is not None
+
+    @property
+    def version(self) -> Optional[float]:
+        """Build time of the current snapshot, or None; changes whenever the snapshot is refreshed."""
+        snapshot = self._current()
+        return snapshot.metadata.get('created_at') if snapshot is not None else None
+
+    def covers(self, id_type: str) -> bool:
+        snapshot = self._current()
+        return snapshot is not None and snapshot.covers(id_type)
+
+    def lookup(self, id_type: str, identifier: str, org_name: Optional[str] = None) -> Optional[dict]:
+        """
+        Looks up one identifier. Returns None if no loaded snapshot covers `id_type`,
+        otherwise a dict with 'exists', 'active', 'status', 'registered_name' and
+        'name_matches' (None when no org_name was given or the identifier is unknown).
+        """
+        snapshot = self._current()
+        if snapshot is None or not snapshot.covers(id_type):
+            return None
+
+        found = snapshot.get(id_type, identifier)
+        if found is None:
+            return {'exists': False, 'active': False, 'status': None, 'registered_name': None, 'name_matches': None}
+
+        registered_name, registry_status = found
+        name_matches = None
+        if org_name:
+            name_matches = normalize_name(org_name) == normalize_name(registered_name)
+        return {
+            'exists': True,
+            'active': registry_status == "active",
+            'status': registry_status,
+            'registered_name': registered_name,
+            'name_matches': name_matches
+        }
+
+    def refresh(self, sources: List[str], default_id_type: Optional[str] = None) -> dict:
+        """Rebuilds the snapshot from `sources` and atomically swaps it in for this and every other process."""
+        if not self.path:
+            raise ValueError("No registry snapshot path configured.")
+        metadata = build_snapshot(sources, self.path, default_id_type)
+        self._checked_at = 0.0
+        self._current()
+        return metadata
+
+    def stats(self) -> dict:
+        snapshot = self._current()
+        return {'path': self.path, 'loaded': snapshot is not None,
+                'metadata': snapshot.metadata if snapshot is not None else None}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query an offline registry snapshot.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Compile registry dumps into a snapshot file.")
+    build_parser.add_argument("output")
+    build_parser.add_argument("sources", nargs="+")
+    build_parser.add_argument("--id-type", help="id_type for sources without an id_type column.")
+
+    lookup_parser = subparsers.add_parser("lookup", help="Look up one identifier.")
+    lookup_parser.add_argument("snapshot")
+    lookup_parser.add_argument("id_type")
+    lookup_parser.add_argument("identifier")
+    lookup_parser.add_argument("--name")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        print(json.dumps(build_snapshot(args.sources, args.output, args.id_type), indent=2))
+    else:
+        started = time.perf_counter()
+        result = RegistryIndex(args.snapshot).lookup(args.id_type, args.identifier, args.name)
+        print(json.dumps({'result': result, 'microseconds': (time.perf_counter() - started) * 1e6}, indent=2))
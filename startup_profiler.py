@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""startup_profiler.py
+
+Breakdown of where the backend's cold start goes.
+
+main.py starts import timing before its first third-party import. Each module
+imported for the first time is timed inclusively (including the modules it
+imports itself) and exclusively (self time). Startup is also split into
+consecutive named phases by calling mark(name) at the end of each one: the
+imports, Firebase and Algolia initialisation, then the model loading, warm-up
+and seeding steps of startup_event. Each phase records its duration and the
+process RSS when it ends. At the end of startup_event the report is printed
+as one JSON line and served from /startup-profile.
+
+Imports done through importlib.import_module (e.g. transformers' lazy
+submodules) are not timed on their own. They count towards the import or phase
+that triggered them.
+
+Usage:
+    python startup_profiler.py [--run-startup] [--top 25]
+"""
+
+import argparse
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MiB (peak RSS where /proc isn't available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and KiB on Linux
+        return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+class StartupProfiler:
+    """Times first-time module imports and named startup phases of one process."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.started_rss_mb = current_rss_mb()
+        self.imports: Dict[str, dict] = {}
+        self.phases: List[dict] = []
+        self._phase_started_at = self.started_at
+        self._phase_started_rss_mb = self.started_rss_mb
+        self._original_import = None
+        self._installed_import = None
+        self._import_stack: List[list] = []
+        self._import_thread = None
+        self._lock = threading.Lock()
+
+    # --- Imports ---
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original_import = self._original_import or builtins.__import__
+        # Relative imports, already-imported modules and imports from other threads aren't timed
+        if (level or name in sys.modules or self._original_import is None
+                or threading.current_thread() is not self._import_thread):
+            return original_import(name, globals, locals, fromlist, level)
+
+        frame = [name, 0.0] # Module name and time spent in nested first-time imports
+        self._import_stack.append(frame)
+        started = time.perf_counter()
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._import_stack.pop()
+            if self._import_stack:
+                self._import_stack[-1][1] += elapsed
+            self.imports.setdefault(name, {
+                'inclusive_ms': elapsed * 1000.0,
+                'self_ms': (elapsed - frame[1]) * 1000.0,
+                'parent': self._import_stack[-1][0] if self._import_stack else None
+            })
+
+    def start_import_timing(self):
+        """Times every first-time import made by the calling thread until stop_import_timing()."""
+        with self._lock:
+            if self._original_import is not None:
+                return
+            self._import_thread = threading.current_thread()
+            self._original_import = builtins.__import__
+            # Keep the bound method so stop_import_timing can tell whether it is still installed
+            self._installed_import = self._timed_import
+            builtins.__import__ = self._installed_import
+
+    def stop_import_timing(self):
+        with self._lock:
+            if self._original_import is None:
+                return
+            if builtins.__import__ is self._installed_import:
+                builtins.__import__ = self._original_import
+            self._original_import = None
+            self._installed_import = None
+
+    # --- Phases ---
+
+    def mark(self, name: str):
+        """Ends phase `name`, which started where the previous phase (or the profiler) ended."""
+        now, rss = time.perf_counter(), current_rss_mb()
+        self.phases.append({
+            'name': name,
+            'seconds': now - self._phase_started_at,
+            'rss_mb': rss,
+            'rss_delta_mb': rss - self._phase_started_rss_mb
+        })
+        self._phase_started_at, self._phase_started_rss_mb = now, rss
+
+    # --- Report ---
+
+    def report(self, top: int = 25) -> dict:
+        """The slowest `top` top-level and self-time imports, every phase, and the totals."""
+        by_inclusive = sorted(self.imports.items(), key=lambda item: item[1]['inclusive_ms'], reverse=True)
+        by_self = sorted(self.imports.items(), key=lambda item: item[1]['self_ms'], reverse=True)
+        return {
+            'pid': os.getpid(),
+            'elapsed_seconds': time.perf_counter() - self.started_at,
+            'rss_mb': current_rss_mb(),
+            'start_rss_mb': self.started_rss_mb,
+            'imports': {
+                'modules_timed': len(self.imports),
+                'total_ms': sum(entry['inclusive_ms'] for name, entry in self.imports.items()
+                                if entry['parent'] is None),
+                'slowest_top_level': [{'module': name, **entry} for name, entry in by_inclusive
+                                      if entry['parent'] is None][:top],
+                'slowest_self': [{'module': name, **entry} for name, entry in by_self][:top]
+            },
+            'phases': list(self.phases)
+        }
+
+    def emit(self, top: int = 25, path: Optional[str] = None) -> dict:
+        """Prints the report as one JSON line (for log-based dashboards) and optionally writes it to `path`."""
+        report = self.report(top)
+        print(f"Startup profile: {json.dumps(report)}")
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        return report
+
+
+startup_profiler = StartupProfiler()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile importing (and optionally starting) the backend.")
+    parser.add_argument("--run-startup", action="store_true", help="Also run main.startup_event().")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    # main.py records its own imports and phases on the shared startup_profiler
+    import main
+
+    if args.run_startup:
+        import asyncio
+        asyncio.run(main.startup_event())
+    main.startup_profiler.stop_import_timing()
+    print(json.dumps(main.startup_profiler.report(args.top), indent=2))
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""train_fraud_model.py
+
+Background training job for the fraud model.
+
+Fine-tunes DistilBERT into a new version directory under the model root and,
+only once the checkpoint is completely written, publishes it by atomically
+replacing the CURRENT pointer (see model_versions.py). Running servers pick the
+new version up through their ModelWatcher and hot-swap to it.
+
+Usage:
+    python train_fraud_model.py --dataset ngo_fraud.csv --k-folds 3
+    python train_fraud_model.py --export-onnx --keep 5
+"""
+
+import argparse
+import shutil
+import sys
+import time
+
+import fraud_detection
+from model_versions import new_version_dir, prune_versions, publish_version, write_version_metadata
+
+
+def train_new_version(dataset_path: str, k_folds: int = 3, model_root: str = fraud_detection.model_root,
+                      export_onnx: bool = False, keep: int = 3):
+    """Trains, optionally exports ONNX graphs, publishes the version and prunes old ones. Returns its directory."""
+    version_dir = new_version_dir(model_root)
+    try:
+        if fraud_detection.fine_tune_model(dataset_path=dataset_path, k_folds=k_folds, save_dir=version_dir) is None:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            return None
+        if export_onnx:
+            from fraud_onnx import export_onnx_model
+            export_onnx_model(version_dir, f"{version_dir}/onnx")
+        write_version_metadata(version_dir, {'kind': 'full', 'dataset': dataset_path, 'k_folds': k_folds,
+                                             'created_at': time.time()})
+    except Exception:
+        # Never leave a half-written version behind for prune_versions to count
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+
+    publish_version(version_dir, model_root)
+    prune_versions(model_root, keep=keep)
+    return version_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and publish a new fraud model version.")
+    parser.add_argument("--dataset", default=fraud_detection.dataset_path)
+    parser.add_argument("--k-folds", type=int, default=3)
+    parser.add_argument("--model-root", default=fraud_detection.model_root)
+    parser.add_argument("--export-onnx", action="store_true", help="Also export fp32/int8 ONNX graphs into the version.")
+    parser.add_argument("--keep", type=int, default=3, help="Number of versions to keep on disk.")
+    args = parser.parse_args()
+
+    published = train_new_version(args.dataset, args.k_folds, args.model_root, args.export_onnx, args.keep)
+    sys.exit(0 if published else 1)
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""translation_cache.py
+
+Two-tier cache of campaign translations.
+
+Each (campaign, field, language) has exactly one Firestore document in the
+`translations` collection, stored under the deterministic id
+'<campaign_id>__<field>__<language>'. A listing page can therefore fetch all of
+its translations with a single get_all() instead of one where() query per
+campaign and field. A bounded in-process LRU tier sits in front of Firestore.
+
+Every entry records a hash of the source text it was translated from. The LRU
+is keyed by that hash, and a Firestore document whose hash doesn't match the
+current source text is treated as a miss. An edited campaign is therefore
+re-translated on the next lookup, and the new translation overwrites the stale
+document in place.
+
+Error placeholders (see translation_engine.is_translation_error) are never
+stored, so a failed translation is retried on the next lookup.
+"""
+
+import collections
+import hashlib
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+from metrics import Counter
+from translation_engine import is_translation_error
+
+TRANSLATIONS_COLLECTION = "translations"
+# Firestore accepts at most 500 writes per batch
+_MAX_BATCH_WRITES = 500
+
+
+def source_hash(text: str) -> str:
+    # Unlike the fraud cache, no normalization: case and spacing change the translation
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()[:32]
+
+
+def translation_doc_id(campaign_id: str, field: str, language: str) -> str:
+    return f"{campaign_id}__{field}__{language}"
+
+
+class TranslationCache:
+    """
+    In-process LRU in front of the Firestore `translations` collection.
+
+    Args:
+        db: Firestore client; None keeps the cache in memory only.
+        max_entries (int): Capacity of the in-memory LRU tier.
+        collection (str): Firestore collection holding the translation documents.
+    """
+
+    def __init__(self, db=None, max_entries: int = 20000, collection: str = TRANSLATIONS_COLLECTION):
+        self.db = db
+        self.max_entries = max_entries
+        self.collection = collection
+        self._memory = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = Counter("translation_cache_hits")
+        self.firestore_hits = Counter("translation_cache_firestore_hits")
+        self.stale = Counter("translation_cache_stale")
+        self.misses = Counter("translation_cache_misses")
+        self.evictions = Counter("translation_cache_evictions")
+        self.rejected = Counter("translation_cache_rejected")
+
+    @staticmethod
+    def _memory_key(campaign_id: str, field: str, language: str, text: str) -> tuple:
+        return campaign_id, field, language, source_hash(text)
+
+    def _remember(self, key: tuple, translated_text: str):
+        with self._lock:
+            self._memory[key] = translated_text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.evictions.inc()
+
+    def get_many(self, lookups: Sequence[Tuple[str, str, str, str]]) -> List[Optional[str]]:
+        """
+        Translations for (campaign_id, field, language, source_text) lookups, None where
+        there is none for the current source text. All memory misses are fetched in one get_all().
+        """
+        results: List[Optional[str]] = [None] * len(lookups)
+        pending = []
+        with self._lock:
+            for i, (campaign_id, field, language, text) in enumerate(lookups):
+                key = self._memory_key(campaign_id, field, language, text)
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    results[i] = self._memory[key]
+                    self.hits.inc()
+                else:
+                    pending.append(i)
+
+        if pending and self.db is not None:
+            collection = self.db.collection(self.collection)
+            pending_by_id = {}
+            for i in pending:
+                campaign_id, field, language, _ = lookups[i]
+                pending_by_id.setdefault(translation_doc_id(campaign_id, field, language), []).append(i)
+            for snapshot in self.db.get_all([collection.document(doc_id) for doc_id in pending_by_id]):
+                if not snapshot.exists:
+                    continue
+                data = snapshot.to_dict()
+                for i in pending_by_id.get(snapshot.id, ()):
+                    campaign_id, field, language, text = lookups[i]
+                    if data.get('source_hash') != source_hash(text):
+                        self.stale.inc() # Source edited since; re-translated and overwritten by put_many
+                        continue
+                    results[i] = data.get('translated_text')
+                    self._remember(self._memory_key(campaign_id, field, language, text), results[i])
+                    self.hits.inc()
+                    self.firestore_hits.inc()
+
+        self.misses.inc(sum(1 for i in pending if results[i] is None))
+        return results
+
+    def get(self, campaign_id: str, field: str, language: str, text: str) -> Optional[str]:
+        return self.get_many([(campaign_id, field, language, text)])[0]
+
+    def put_many(self, entries: Sequence[Tuple[str, str, str, str, str]]):
+        """
+        Stores (campaign_id, field, language, source_text, translated_text) entries in both tiers,
+        skipping error placeholders.
+        """
+        valid = [entry for entry in entries if not is_translation_error(entry[4])]
+        self.rejected.inc(len(entries) - len(valid))
+        entries = valid
+        for campaign_id, field, language, text, translated_text in entries:
+            self._remember(self._memory_key(campaign_id, field, language, text), translated_text)
+        if self.db is None or not entries:
+            return
+
+        from firebase_admin import firestore
+
+        collection = self.db.collection(self.collection)
+        batch = self.db.batch()
+        for written, (campaign_id, field, language, text, translated_text) in enumerate(entries):
+            if written and written % _MAX_BATCH_WRITES == 0:
+                batch.commit()
+                batch = self.db.batch()
+            batch.set(collection.document(translation_doc_id(campaign_id, field, language)), {
+                'campaign_id': campaign_id,
+                'field': field,
+                'language': language,
+                'source_hash': source_hash(text),
+                'translated_text': translated_text,
+                'timestamp': firestore.SERVER_TIMESTAMP
+            })
+        batch.commit()
+
+    def put(self, campaign_id: str, field: str, language: str, text: str, translated_text: str):
+        self.put_many([(campaign_id, field, language, text, translated_text)])
+
+    def stats(self) -> dict:
+        lookups = self.hits.value + self.misses.value
+        return {
+            'memory_entries': len(self._memory),
+            'max_entries': self.max_entries,
+            'hits': self.hits.value,
+            'firestore_hits': self.firestore_hits.value,
+            'stale': self.stale.value,
+            'misses': self.misses.value,
+            'evictions': self.evictions.value,
+            'rejected': self.rejected.value,
+            'hit_rate': (self.hits.value / lookups) if lookups else 0.0
+        }
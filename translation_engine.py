@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""translation_engine.py
+
+Batched IndicTrans2 translation.
+
+translate_batch takes any number of (text, source_lang, target_lang) items and
+translates them in as few generate() calls as possible:
+  1. identical items are translated once,
+  2. the rest are grouped by language pair (IndicProcessor tags every sentence
+     with its pair, so a batch can only hold one pair),
+  3. each group is sorted by length and cut into batches of at most
+     max_batch_size texts and max_batch_words padded words, so short names
+     aren't padded to the length of long descriptions,
+  4. each batch runs preprocess_batch -> tokenizer -> generate -> batch_decode ->
+     postprocess_batch.
+
+A listing of 100 campaigns in Hindi (100 names + 100 descriptions) therefore
+costs about 200 / max_batch_size generate calls instead of 200.
+
+Generation runs on one of three engines (see load_translator):
+    pytorch       the fp32 Hugging Face model (optionally compiled, see model_compile.py)
+    pytorch-int8  the same model with its Linear layers dynamically quantized to int8 (CPU)
+    ctranslate2   an int8 CTranslate2 model. CTranslate2 can't convert the custom Hugging
+                  Face IndicTrans architecture, so it is converted from the fairseq
+                  release of the same checkpoint (`python translation_engine.py convert`).
+                  The Hugging Face tokenizer still prepares its input.
+
+and with one of the DECODING_PROFILES, chosen per request or by load (choose_profile).
+stream_translation decodes a single text greedily and yields it as it is generated.
+
+Usage:
+    python translation_engine.py convert --fairseq-checkpoint checkpoint_best.pt --fairseq-data-dir final_bin
+"""
+
+import argparse
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# App language codes -> IndicTrans2 (FLORES-200) codes
+LANG_MAP = {
+    "en": "eng_Latn",
+    "hi": "hin_Deva",
+    "bn": "ben_Beng",
+    "ta": "tam_Taml",
+    "te": "tel_Telu",
+    "mr": "mar_Deva",
+    "gu": "guj_Gujr",
+    "pa": "pan_Guru",
+    "kn": "kan_Knda",
+    "ml": "mal_Mlym",
+    "or": "ori_Orya",
+    "as": "asm_Beng",
+    "ur": "urd_Arab",
+    "ne": "nep_Deva",
+    "si": "sin_Sinh",
+    "my": "mya_Mymr", # Myanmar (Burmese) - example, check if supported
+}
+
+DEFAULT_MODEL_NAME = "ai4bharat/indictrans2-en-indic-1B"
+DEFAULT_MAX_BATCH_SIZE = 16
+DEFAULT_MAX_BATCH_WORDS = 2048
+
+ENGINES = ("pytorch", "pytorch-int8", "ctranslate2")
+
+# Beam search width trades quality for speed; greedy decoding is several times faster than 5 beams on CPU
+DECODING_PROFILES = {
+    "quality": {'num_beams': 5},
+    "balanced": {'num_beams': 2},
+    "fast": {'num_beams': 1},
+}
+
+# Notes appended to the source text in place of a translation (the API has always returned these)
+_ERROR_NOTES = ("(Translation Failed", "(Translation Service Unavailable)", "(Unsupported language code")
+
+# IndicProcessor queues the entity placeholders of preprocess_batch for the next postprocess_batch,
+# so concurrent batches in one process must not interleave
+_processor_lock = threading.Lock()
+
+
+def plan_batches(texts: Sequence[str], max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_batch_words: int = DEFAULT_MAX_BATCH_WORDS) -> List[List[int]]:
+    """
+    Splits the indices of `texts` (all of one language pair) into length-sorted
+    batches whose padded size (count x longest, in words) stays within budget.
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i].split()))
+    batches, current, longest = [], [], 0
+    for i in order:
+        words = max(1, len(texts[i].split()))
+        if current and (len(current) >= max_batch_size or (len(current) + 1) * max(longest, words) > max_batch_words):
+            batches.append(current)
+            current, longest = [], 0
+        current.append(i)
+        longest = max(longest, words)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def is_translation_error(translation: str) -> bool:
+    """True for the source-text-plus-error-note placeholders returned when translation isn't possible."""
+    return translation.endswith(")") and any(note in translation for note in _ERROR_NOTES)
+
+
+def choose_profile(requested: Optional[str] = None, in_flight: int = 0, default: str = "quality",
+                   balanced_above: int = 16, fast_above: int = 64) -> str:
+    """
+    The requested decoding profile if it is a known one. Otherwise the profile for the
+    current load: `default`, then "balanced" above `balanced_above` texts in flight and
+    "fast" above `fast_above`.
+    """
+    if requested in DECODING_PROFILES:
+        return requested
+    if in_flight > fast_above:
+        return "fast"
+    if in_flight > balanced_above:
+        return "balanced"
+    return default
+
+
+class TorchTranslator:
+    """Generates with a Hugging Face seq2seq model (fp32, or int8 after quantize_dynamic_int8)."""
+
+    def __init__(self, model, tokenizer, device="cpu", engine: str = "pytorch"):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.engine = engine
+
+    def generate(self, batch: List[str], num_beams: int, max_length: int) -> Tuple[List[str], int]:
+        """Decoded translations of preprocessed sentences, and the number of generated tokens."""
+        import torch
+
+        inputs = self.tokenizer(
+            batch,
+            truncation=True,
+            padding="longest",
+            return_tensors="pt",
+            return_attention_mask=True,
+        ).to(self.device)
+        with torch.no_grad():
+            generated_tokens = self.model.generate(
+                **inputs,
+                use_cache=True,
+                min_length=0,
+                max_length=max_length,
+                num_beams=num_beams,
+                num_return_sequences=1,
+            )
+        generated = int((generated_tokens != self.tokenizer.pad_token_id).sum())
+        decoded = self.tokenizer.batch_decode(generated_tokens.detach().cpu().tolist(), skip_special_tokens=True,
+                                              clean_up_tokenization_spaces=True)
+        return decoded, generated
+
+    def stream(self, sentence: str, max_length: int, stop: threading.Event) -> Iterator[str]:
+        """Greedily decodes one preprocessed sentence, yielding text as it is generated (beam search can't stream)."""
+        import torch
+        from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+        class _Stopped(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs) -> bool:
+                return stop.is_set()
+
+        inputs = self.tokenizer([sentence], truncation=True, return_tensors="pt",
+                                return_attention_mask=True).to(self.device)
+        # skip_prompt drops the decoder start token generate() hands the streamer first
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+
+        def run():
+            with torch.no_grad():
+                self.model.generate(**inputs, use_cache=True, min_length=0, max_length=max_length, num_beams=1,
+                                    streamer=streamer, stopping_criteria=StoppingCriteriaList([_Stopped()]))
+
+        generator = threading.Thread(target=run, name="indictrans2-stream", daemon=True)
+        generator.start()
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+        finally:
+            stop.set()
+            generator.join()
+
+
+class CTranslate2Translator:
+    """
+    Generates with a CTranslate2 model converted from the fairseq IndicTrans2 checkpoint.
+
+    Args:
+        model_dir (str): Output directory of `translation_engine.py convert`.
+        tokenizer: The Hugging Face IndicTrans2 tokenizer; its source pieces match the fairseq dictionary.
+        compute_type (str): CTranslate2 compute type; "int8" (CPU) or "int8_float16" (GPU).
+        intra_threads (int): Threads per translation; 0 lets CTranslate2 decide.
+    """
+
+    def __init__(self, model_dir: str, tokenizer, device="cpu", compute_type: str = "int8", intra_threads: int = 0):
+        import ctranslate2
+
+        self.translator = ctranslate2.Translator(model_dir, device=str(device), compute_type=compute_type,
+                                                 intra_threads=intra_threads)
+        self.tokenizer = tokenizer
+        self.device = device
+        self.engine = "ctranslate2"
+
+    def _source_tokens(self, batch: List[str]) -> List[List[str]]:
+        special_ids = {self.tokenizer.pad_token_id, self.tokenizer.eos_token_id}
+        return [
+            self.tokenizer.convert_ids_to_tokens([i for i in ids if i not in special_ids])
+            for ids in self.tokenizer(batch, truncation=True, add_special_tokens=True)["input_ids"]
+        ]
+
+    def generate(self, batch: List[str], num_beams: int, max_length: int) -> Tuple[List[str], int]:
+        results = self.translator.translate_batch(self._source_tokens(batch), beam_size=num_beams,
+                                                  max_decoding_length=max_length, return_scores=False)
+        hypotheses = [result.hypotheses[0] for result in results]
+        # Target pieces are SentencePiece tokens; detokenizing them doesn't need the target vocabulary
+        decoded = ["".join(tokens).replace("\u2581", " ").strip() for tokens in hypotheses]
+        return decoded, sum(len(tokens) for tokens in hypotheses)
+
+    def stream(self, sentence: str, max_length: int, stop: threading.Event) -> Iterator[str]:
+        started = False
+        for step in self.translator.generate_tokens(self._source_tokens([sentence])[0], max_decoding_length=max_length):
+            if stop.is_set():
+                break # Closing generate_tokens stops decoding
+            text = step.token.replace("\u2581", " ")
+            if not started:
+                text, started = text.lstrip(), True
+            if text:
+                yield text
+
+
+def quantize_dynamic_int8(model):
+    """int8 dynamic quantization of the Linear layers; weights shrink 4x and CPU matmuls speed up."""
+    import torch
+
+    started = time.perf_counter()
+    quantized = torch.quantization.quantize_dynamic(model.to("cpu"), {torch.nn.Linear}, dtype=torch.qint8)
+    print(f"Quantized IndicTrans2 to int8 in {time.perf_counter() - started:.1f}s.")
+    return quantized
+
+
+def load_translator(engine: str = "pytorch", model_name: str = DEFAULT_MODEL_NAME, device="cpu",
+                    ct2_model_dir: Optional[str] = None, compile_mode: str = "none"):
+    """
+    Loads the tokenizer and the requested engine. A ctranslate2 engine that can't be
+    loaded falls back to PyTorch, like the fraud model's ONNX backends do.
+    """
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown translation engine '{engine}'; expected one of {ENGINES}.")
+    tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+
+    if engine == "ctranslate2":
+        try:
+            return CTranslate2Translator(ct2_model_dir, tokenizer, device)
+        except Exception as e:
+            print(f"Error loading the CTranslate2 model from {ct2_model_dir}: {e}")
+            print("Falling back to the PyTorch translation engine.")
+            engine = "pytorch"
+
+    from model_compile import compile_seq2seq
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, trust_remote_code=True).eval()
+    if engine == "pytorch-int8":
+        if str(device) != "cpu":
+            print("Dynamic int8 quantization runs on CPU only; loading the int8 model on CPU.")
+        model, device = quantize_dynamic_int8(model), "cpu"
+    else:
+        model = model.to(device)
+    return TorchTranslator(compile_seq2seq(model, compile_mode), tokenizer, device, engine)
+
+
+def convert_to_ctranslate2(fairseq_checkpoint: str, fairseq_data_dir: str, output_dir: str,
+                           quantization: str = "int8") -> str:
+    """Converts the fairseq IndicTrans2 checkpoint to a quantized CTranslate2 model directory."""
+    from ctranslate2.converters import FairseqConverter
+
+    started = time.perf_counter()
+    FairseqConverter(fairseq_checkpoint, fairseq_data_dir).convert(output_dir, quantization=quantization, force=True)
+    print(f"Converted {fairseq_checkpoint} to {output_dir} ({quantization}) in {time.perf_counter() - started:.0f}s.")
+    return output_dir
+
+
+def _translate_texts(texts: List[str], src_code: str, tgt_code: str, translator, processor, num_beams: int,
+                     max_length: int) -> Tuple[List[str], int]:
+    with _processor_lock:
+        batch = processor.preprocess_batch(texts, src_lang=src_code, tgt_lang=tgt_code)
+        decoded, generated = translator.generate(batch, num_beams, max_length)
+        # Detokenizes and restores the entities preprocess_batch placeholdered
+        return processor.postprocess_batch(decoded, lang=tgt_code), generated
+
+
+def stream_translation(text: str, source_lang: str, target_lang: str, translator, processor,
+                       max_length: int = 256, stop: Optional[threading.Event] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Greedily translates one text, yielding ('delta', text) events as tokens are
+    decoded and finally ('final', translation) with the postprocessed translation.
+    Setting `stop` ends decoding early (e.g. when the client disconnects).
+
+    `processor` must not be shared with concurrent calls: its placeholder state lives
+    from preprocess_batch to postprocess_batch, i.e. for the whole generation, so
+    streams use their own processor instead of holding _processor_lock that long.
+    """
+    if source_lang not in LANG_MAP or target_lang not in LANG_MAP:
+        yield 'final', f"{text} (Unsupported language code for IndicTrans2: {source_lang} or {target_lang})"
+        return
+    stop = stop or threading.Event()
+    sentence = processor.preprocess_batch([text], src_lang=LANG_MAP[source_lang], tgt_lang=LANG_MAP[target_lang])[0]
+    chunks = []
+    for chunk in translator.stream(sentence, max_length, stop):
+        chunks.append(chunk)
+        yield 'delta', chunk
+    translation = processor.postprocess_batch(["".join(chunks).strip()], lang=LANG_MAP[target_lang])[0]
+    yield 'final', translation
+
+
+def translate_batch(items: Sequence[Tuple[str, str, str]], translator, processor, profile: str = "quality",
+                    max_length: int = 256, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                    max_batch_words: int = DEFAULT_MAX_BATCH_WORDS, stats: Optional[dict] = None) -> List[str]:
+    """
+    Translates (text, source_lang, target_lang) items given in app language codes
+    with `translator` (see load_translator) and a DECODING_PROFILES profile. If given,
+    `stats` is filled with the generate call and generated token counts.
+
+    Returns translations aligned with `items`. Like the single-text path, items with
+    unsupported codes or whose batch fails get the source text with an error note.
+    """
+    num_beams = DECODING_PROFILES[profile]['num_beams']
+    started = time.perf_counter()
+    results: List[str] = [""] * len(items)
+    # (source, target) pair -> unique text -> indices of the items with that text
+    groups: Dict[Tuple[str, str], Dict[str, List[int]]] = {}
+    for i, (text, source_lang, target_lang) in enumerate(items):
+        if not text or not str(text).strip() or source_lang == target_lang:
+            results[i] = text
+        elif source_lang not in LANG_MAP or target_lang not in LANG_MAP:
+            results[i] = f"{text} (Unsupported language code for IndicTrans2: {source_lang} or {target_lang})"
+        else:
+            groups.setdefault((source_lang, target_lang), {}).setdefault(text, []).append(i)
+
+    generate_calls = generated_tokens = 0
+    for (source_lang, target_lang), indices_by_text in groups.items():
+        texts = list(indices_by_text)
+        for batch in plan_batches(texts, max_batch_size, max_batch_words):
+            batch_texts = [texts[i] for i in batch]
+            try:
+                translations, generated = _translate_texts(batch_texts, LANG_MAP[source_lang], LANG_MAP[target_lang],
+                                                           translator, processor, num_beams, max_length)
+                generated_tokens += generated
+            except Exception as e:
+                print(f"Error during batched IndicTrans2 translation ({source_lang}->{target_lang}): {e}")
+                translations = [f"{text} (Translation Failed: {e})" for text in batch_texts]
+            generate_calls += 1
+            for text, translation in zip(batch_texts, translations):
+                for i in indices_by_text[text]:
+                    results[i] = translation
+
+    if stats is not None:
+        stats.update(generate_calls=generate_calls, generated_tokens=generated_tokens)
+    if generate_calls:
+        elapsed = time.perf_counter() - started
+        unique_texts = sum(len(indices_by_text) for indices_by_text in groups.values())
+        print(f"Translated {len(items)} items ({unique_texts} unique) in {generate_calls} generate calls "
+              f"in {elapsed:.2f}s ({translator.engine}, {profile}, {generated_tokens / elapsed:.0f} tokens/s).")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="IndicTrans2 translation engine tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="Convert the fairseq checkpoint to CTranslate2.")
+    convert_parser.add_argument("--fairseq-checkpoint", required=True)
+    convert_parser.add_argument("--fairseq-data-dir", required=True, help="Directory with the fairseq dictionaries.")
+    convert_parser.add_argument("--output-dir", default="./indictrans2-ct2-int8")
+    convert_parser.add_argument("--quantization", default="int8")
+
+    args = parser.parse_args()
+    convert_to_ctranslate2(args.fairseq_checkpoint, args.fairseq_data_dir, args.output_dir, args.quantization)
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""translation_memory.py
+
+Sentence-level translation memory.
+
+Campaign texts repeat a lot of boilerplate ("Support our initiative to
+provide ..."), so texts are split into sentences (segments) and every
+translated segment is remembered per language pair:
+  - exact: a segment translated before (same source hash) is served from memory,
+  - fuzzy: a segment whose MinHash similarity (see campaign_dedup.py) to a
+    remembered one is at least fuzzy_threshold, and whose words are the same
+    apart from case, punctuation and articles, reuses that translation,
+  - everything else is sent to the model, and the result is remembered.
+
+Only missed segments reach the model. A description whose first sentences are
+boilerplate therefore costs one short generate input instead of the whole text.
+
+Similarity alone is not enough for fuzzy reuse: "We are not raising funds"
+is a near match of "We are raising funds", and a changed amount is a near
+match of the original. Any other word-level edit is therefore a miss.
+
+Hits are counted per target language. Pairs are persisted to SQLite and
+reloaded by load(); each process opens its own connection on first use, as a
+connection must not be carried across fork().
+"""
+
+import collections
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from campaign_dedup import MinHashLSHIndex
+from metrics import Counter
+from translation_engine import is_translation_error
+
+# Sentence ends: Latin punctuation and the Devanagari danda, followed by whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+_WORD = re.compile(r"\w+", re.UNICODE)
+# Words a fuzzy match may add, drop or change without changing the translation
+_IGNORABLE_WORDS = frozenset(("a", "an", "the"))
+
+
+def split_segments(text: str) -> List[str]:
+    return [segment for segment in _SENTENCE_END.split((text or "").strip()) if segment]
+
+
+def segment_hash(segment: str) -> str:
+    return hashlib.sha256(segment.encode("utf-8")).hexdigest()[:32]
+
+
+def _content_words(segment: str) -> List[str]:
+    return [word for word in (match.lower() for match in _WORD.findall(segment)) if word not in _IGNORABLE_WORDS]
+
+
+class TranslationPlan:
+    """Segments of a batch of items that the memory couldn't serve; complete() assembles the final texts."""
+
+    def __init__(self, memory: "TranslationMemory", items: Sequence[Tuple[str, str, str]]):
+        self.memory = memory
+        self.items = list(items)
+        # Per item: list of segment translations (None until translated) and their sources
+        self._segments: List[List[Optional[str]]] = []
+        self._sources: List[List[str]] = []
+        self.misses: List[Tuple[str, str, str]] = []
+        self._miss_slots: List[List[Tuple[int, int]]] = []
+        self._miss_index: Dict[Tuple[str, str, str], int] = {}
+
+    def _add_miss(self, item_index: int, segment_index: int, item: Tuple[str, str, str]):
+        # Repeated segments in one batch are translated once
+        index = self._miss_index.get(item)
+        if index is None:
+            index = self._miss_index[item] = len(self.misses)
+            self.misses.append(item)
+            self._miss_slots.append([])
+        self._miss_slots[index].append((item_index, segment_index))
+
+    def complete(self, translations: Sequence[str]) -> List[str]:
+        """Takes the translations of `misses`, remembers them and returns the translations of `items`."""
+        self.memory.remember_many([(segment, source_lang, target_lang, translation)
+                                   for (segment, source_lang, target_lang), translation in zip(self.misses, translations)])
+        for slots, translation in zip(self._miss_slots, translations):
+            for item_index, segment_index in slots:
+                self._segments[item_index][segment_index] = translation
+        return [" ".join(segments) if sources else text
+                for (text, _, _), segments, sources in zip(self.items, self._segments, self._sources)]
+
+
+class TranslationMemory:
+    """
+    Exact and fuzzy sentence-level memory of previous translations.
+
+    Args:
+        path (str): SQLite file the pairs are persisted to; None keeps them in memory only.
+        fuzzy_threshold (float): Minimum MinHash similarity for reusing a near match; above 1 disables fuzzy reuse.
+        max_entries (int): Pairs kept in memory (oldest dropped first).
+    """
+
+    def __init__(self, path: Optional[str] = None, fuzzy_threshold: float = 0.9, max_entries: int = 500000):
+        self.path = path
+        self.fuzzy_threshold = fuzzy_threshold
+        self.max_entries = max_entries
+        # (source_lang, target_lang, source hash) -> target; source hash -> (source_lang, segment) and the
+        # number of pairs translating it; source_lang -> LSH index of source segments
+        self._pairs = collections.OrderedDict()
+        self._sources: Dict[str, Tuple[str, str]] = {}
+        self._source_pairs = collections.Counter()
+        self._fuzzy: Dict[str, MinHashLSHIndex] = {}
+        self._evicted_sources = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = os.getpid()
+        self._counters: Dict[str, Dict[str, Counter]] = {}
+
+    def _check_pid(self):
+        # A forked child must not reuse the parent's connection, nor a lock a parent thread may have held
+        if self._pid != os.getpid():
+            self._lock = threading.Lock()
+            self._db = None
+            self._pid = os.getpid()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        # Caller holds self._lock
+        if self._db is None and self.path:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                "source_lang TEXT, target_lang TEXT, source_hash TEXT, source TEXT, target TEXT, created_at REAL, "
+                "PRIMARY KEY (source_lang, target_lang, source_hash))"
+            )
+            self._db.commit()
+        return self._db
+
+    def _counter(self, target_lang: str, outcome: str) -> Counter:
+        counters = self._counters.setdefault(target_lang, {
+            name: Counter(f"translation_memory_{target_lang}_{name}") for name in ('exact', 'fuzzy', 'misses')
+        })
+        return counters[outcome]
+
+    def _index(self, source_lang: str, source_hash: str, segment: str):
+        # Caller holds self._lock
+        index = self._fuzzy.get(source_lang)
+        if index is None:
+            index = self._fuzzy[source_lang] = MinHashLSHIndex(threshold=self.fuzzy_threshold)
+        index.add(source_hash, segment)
+
+    def _rebuild_indexes(self):
+        # Caller holds self._lock. The LSH index can't delete, so evicted sources are dropped by
+        # rebuilding once they outnumber the live ones; this keeps memory bounded by max_entries.
+        self._fuzzy = {}
+        for source_hash, (source_lang, segment) in self._sources.items():
+            self._index(source_lang, source_hash, segment)
+        self._evicted_sources = 0
+
+    def _store(self, source_lang: str, target_lang: str, source_hash: str, segment: str, target: str):
+        # Caller holds self._lock
+        key = (source_lang, target_lang, source_hash)
+        if key not in self._pairs:
+            self._source_pairs[source_hash] += 1
+        self._pairs[key] = target
+        self._pairs.move_to_end(key)
+        while len(self._pairs) > self.max_entries:
+            (_, _, evicted_hash), _ = self._pairs.popitem(last=False)
+            self._source_pairs[evicted_hash] -= 1
+            if self._source_pairs[evicted_hash] <= 0:
+                del self._source_pairs[evicted_hash]
+                self._sources.pop(evicted_hash, None)
+                self._evicted_sources += 1
+
+        if source_hash not in self._sources:
+            self._sources[source_hash] = (source_lang, segment)
+            if self.fuzzy_threshold <= 1.0:
+                self._index(source_lang, source_hash, segment)
+        if self.fuzzy_threshold <= 1.0 and self._evicted_sources > max(len(self._sources), 1024):
+            self._rebuild_indexes()
+
+    def load(self) -> int:
+        """Loads the newest max_entries persisted pairs. Returns the number loaded."""
+        if not self.path:
+            return 0
+        started = time.perf_counter()
+        self._check_pid()
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT source_lang, target_lang, source_hash, source, target FROM segments "
+                "ORDER BY created_at DESC LIMIT ?", (self.max_entries,)
+            ).fetchall()
+            for source_lang, target_lang, source_hash, source, target in reversed(rows):
+                self._store(source_lang, target_lang, source_hash, source, target)
+        print(f"Loaded {len(rows)} translation memory segments in {time.perf_counter() - started:.2f}s.")
+        return len(rows)
+
+    def lookup(self, segment: str, source_lang: str, target_lang: str) -> Tuple[Optional[str], str]:
+        """(translation, 'exact' | 'fuzzy' | 'misses') for one segment."""
+        source_hash = segment_hash(segment)
+        self._check_pid()
+        with self._lock:
+            target = self._pairs.get((source_lang, target_lang, source_hash))
+            if target is not None:
+                return target, 'exact'
+            index = self._fuzzy.get(source_lang)
+        if index is None:
+            return None, 'misses'
+
+        match = index.query(segment)
+        if match is not None:
+            with self._lock:
+                near_source = self._sources.get(match['campaign_id'], (source_lang, ""))[1]
+                target = self._pairs.get((source_lang, target_lang, match['campaign_id']))
+            # A near match with a negation, another amount or any other changed word translates differently
+            if target is not None and _content_words(near_source) == _content_words(segment):
+                return target, 'fuzzy'
+        return None, 'misses'
+
+    def plan(self, items: Sequence[Tuple[str, str, str]]) -> TranslationPlan:
+        """Splits (text, source_lang, target_lang) items into segments and resolves what the memory can."""
+        plan = TranslationPlan(self, items)
+        for item_index, (text, source_lang, target_lang) in enumerate(items):
+            sources = split_segments(text) if text and source_lang != target_lang else []
+            segments: List[Optional[str]] = []
+            for segment_index, segment in enumerate(sources):
+                translation, outcome = self.lookup(segment, source_lang, target_lang)
+                self._counter(target_lang, outcome).inc()
+                segments.append(translation)
+                if translation is None:
+                    plan._add_miss(item_index, segment_index, (segment, source_lang, target_lang))
+            plan._segments.append(segments)
+            plan._sources.append(sources)
+        return plan
+
+    def remember_many(self, pairs: Sequence[Tuple[str, str, str, str]]):
+        """Stores (segment, source_lang, target_lang, translation) pairs; failed translations are skipped."""
+        pairs = [pair for pair in pairs if pair[3] and not is_translation_error(pair[3])]
+        if not pairs:
+            return
+        created_at = time.time()
+        self._check_pid()
+        with self._lock:
+            rows = []
+            for segment, source_lang, target_lang, translation in pairs:
+                source_hash = segment_hash(segment)
+                self._store(source_lang, target_lang, source_hash, segment, translation)
+                rows.append((source_lang, target_lang, source_hash, segment, translation, created_at))
+            db = self._connection()
+            if db is not None:
+                db.executemany("INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?, ?)", rows)
+                db.commit()
+
+    def translate(self, items: Sequence[Tuple[str, str, str]],
+                  translate_fn: Callable[[List[Tuple[str, str, str]]], List[str]]) -> List[str]:
+        """Synchronous plan -> translate_fn(misses) -> complete."""
+        plan = self.plan(items)
+        return plan.complete(translate_fn(plan.misses) if plan.misses else [])
+
+    def stats(self) -> dict:
+        languages = {}
+        for target_lang, counters in self._counters.items():
+            exact, fuzzy, misses = (counters[name].value for name in ('exact', 'fuzzy', 'misses'))
+            segments = exact + fuzzy + misses
+            languages[target_lang] = {
+                'segments': segments,
+                'exact_hits': exact,
+                'fuzzy_hits': fuzzy,
+                'misses': misses,
+                'hit_rate': (exact + fuzzy) / segments if segments else 0.0
+            }
+        return {
+            'path': self.path,
+            'pairs': len(self._pairs),
+            'source_segments': len(self._sources),
+            'fuzzy_threshold': self.fuzzy_threshold,
+            'languages': languages
+        }